@@ -1,9 +1,310 @@
-import customtkinter as ctk
 import re
 import os
-import tkinter.font as tkfont
-import pandas as pd
+import numpy as np
 import csv
+import sys
+import mmap
+import hashlib
+import zlib
+import math
+import tempfile
+import argparse
+import contextlib
+import struct
+import time
+import multiprocessing
+import random
+import itertools
+import functools
+import collections
+from collections import Counter
+from array import array
+
+CONVERTER_VERSION = "1.1"
+EXTENSIONS = ("RV32I",)
+
+# On-disk encoding cache defaults
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "riscv_instruction_converter")
+CACHE_MAX_BYTES = 256 * 1024 * 1024
+CACHE_CHUNK_SIZE = 4096
+# Temporary files younger than this may still be written by another process
+CACHE_TMP_GRACE = 60.0
+# Seconds between full rescans of the cache directory, which correct the running size total
+CACHE_RESCAN_INTERVAL = 3600.0
+# Eviction frees space down to this fraction of the budget, so the next puts need no scan
+CACHE_EVICT_TARGET = 0.9
+
+# Instructions dictionary (RV32I base instruction set) with added structure and descriptions
+INSTRUCTIONS = {
+    "R": {
+        "ADD": {
+            "funct7": "0000000", "funct3": "000", "opcode": "0110011",
+            "structure": "rd, rs1, rs2",
+            "description_en": "ADD: Adds the values in rs1 and rs2, stores the result in rd.",
+            "description_zh": "ADD:将 rs1 和 rs2 中的值相加,结果存入 rd。"
+        },
+        "SUB": {
+            "funct7": "0100000", "funct3": "000", "opcode": "0110011",
+            "structure": "rd, rs1, rs2",
+            "description_en": "SUB: Subtracts rs2 from rs1, stores the result in rd.",
+            "description_zh": "SUB:从 rs1 中减去 rs2,结果存入 rd。"
+        },
+        "SLL": {
+            "funct7": "0000000", "funct3": "001", "opcode": "0110011",
+            "structure": "rd, rs1, rs2",
+            "description_en": "SLL: Logical left shift on rs1 by rs2 bits, stores in rd.",
+            "description_zh": "SLL:将 rs1 逻辑左移 rs2 位,结果存入 rd。"
+        },
+        "SLT": {
+            "funct7": "0000000", "funct3": "010", "opcode": "0110011",
+            "structure": "rd, rs1, rs2",
+            "description_en": "SLT: Sets rd to 1 if rs1 < rs2 (signed), else 0.",
+            "description_zh": "SLT:如果 rs1 < rs2(有符号),将 rd 设为 1,否则为 0。"
+        },
+        "SLTU": {
+            "funct7": "0000000", "funct3": "011", "opcode": "0110011",
+            "structure": "rd, rs1, rs2",
+            "description_en": "SLTU: Sets rd to 1 if rs1 < rs2 (unsigned), else 0.",
+            "description_zh": "SLTU:如果 rs1 < rs2(无符号),将 rd 设为 1,否则为 0。"
+        },
+        "XOR": {
+            "funct7": "0000000", "funct3": "100", "opcode": "0110011",
+            "structure": "rd, rs1, rs2",
+            "description_en": "XOR: Bitwise XOR of rs1 and rs2, stores in rd.",
+            "description_zh": "XOR:rs1 和 rs2 的按位异或,结果存入 rd。"
+        },
+        "SRL": {
+            "funct7": "0000000", "funct3": "101", "opcode": "0110011",
+            "structure": "rd, rs1, rs2",
+            "description_en": "SRL: Logical right shift on rs1 by rs2 bits, stores in rd.",
+            "description_zh": "SRL:将 rs1 逻辑右移 rs2 位,结果存入 rd。"
+        },
+        "SRA": {
+            "funct7": "0100000", "funct3": "101", "opcode": "0110011",
+            "structure": "rd, rs1, rs2",
+            "description_en": "SRA: Arithmetic right shift on rs1 by rs2 bits, stores in rd.",
+            "description_zh": "SRA:将 rs1 算术右移 rs2 位,结果存入 rd。"
+        },
+        "OR": {
+            "funct7": "0000000", "funct3": "110", "opcode": "0110011",
+            "structure": "rd, rs1, rs2",
+            "description_en": "OR: Bitwise OR of rs1 and rs2, stores in rd.",
+            "description_zh": "OR:rs1 和 rs2 的按位或,结果存入 rd。"
+        },
+        "AND": {
+            "funct7": "0000000", "funct3": "111", "opcode": "0110011",
+            "structure": "rd, rs1, rs2",
+            "description_en": "AND: Bitwise AND of rs1 and rs2, stores in rd.",
+            "description_zh": "AND:rs1 和 rs2 的按位与,结果存入 rd。"
+        },
+    },
+    "I": {
+        "ADDI": {
+            "funct3": "000", "opcode": "0010011",
+            "structure": "rd, rs1, imm",
+            "description_en": "ADDI: Adds immediate to rs1, stores in rd.",
+            "description_zh": "ADDI:将立即数加到 rs1,结果存入 rd。"
+        },
+        "SLTI": {
+            "funct3": "010", "opcode": "0010011",
+            "structure": "rd, rs1, imm",
+            "description_en": "SLTI: Sets rd to 1 if rs1 < imm (signed), else 0.",
+            "description_zh": "SLTI:如果 rs1 < imm(有符号),将 rd 设为 1,否则为 0。"
+        },
+        "SLTIU": {
+            "funct3": "011", "opcode": "0010011",
+            "structure": "rd, rs1, imm",
+            "description_en": "SLTIU: Sets rd to 1 if rs1 < imm (unsigned), else 0.",
+            "description_zh": "SLTIU:如果 rs1 < imm(无符号),将 rd 设为 1,否则为 0。"
+        },
+        "XORI": {
+            "funct3": "100", "opcode": "0010011",
+            "structure": "rd, rs1, imm",
+            "description_en": "XORI: Bitwise XOR of rs1 and imm, stores in rd.",
+            "description_zh": "XORI:rs1 和 imm 的按位异或,结果存入 rd。"
+        },
+        "ORI": {
+            "funct3": "110", "opcode": "0010011",
+            "structure": "rd, rs1, imm",
+            "description_en": "ORI: Bitwise OR of rs1 and imm, stores in rd.",
+            "description_zh": "ORI:rs1 和 imm 的按位或,结果存入 rd。"
+        },
+        "ANDI": {
+            "funct3": "111", "opcode": "0010011",
+            "structure": "rd, rs1, imm",
+            "description_en": "ANDI: Bitwise AND of rs1 and imm, stores in rd.",
+            "description_zh": "ANDI:rs1 和 imm 的按位与,结果存入 rd。"
+        },
+        "SLLI": {
+            "funct7": "0000000", "funct3": "001", "opcode": "0010011",
+            "structure": "rd, rs1, imm",
+            "description_en": "SLLI: Logical left shift on rs1 by imm bits, stores in rd.",
+            "description_zh": "SLLI:将 rs1 逻辑左移 imm 位,结果存入 rd。"
+        },
+        "SRLI": {
+            "funct7": "0000000", "funct3": "101", "opcode": "0010011",
+            "structure": "rd, rs1, imm",
+            "description_en": "SRLI: Logical right shift on rs1 by imm bits, stores in rd.",
+            "description_zh": "SRLI:将 rs1 逻辑右移 imm 位,结果存入 rd。"
+        },
+        "SRAI": {
+            "funct7": "0100000", "funct3": "101", "opcode": "0010011",
+            "structure": "rd, rs1, imm",
+            "description_en": "SRAI: Arithmetic right shift on rs1 by imm bits, stores in rd.",
+            "description_zh": "SRAI:将 rs1 算术右移 imm 位,结果存入 rd。"
+        },
+        "LB": {
+            "funct3": "000", "opcode": "0000011",
+            "structure": "rd, imm(rs1)",
+            "description_en": "LB: Loads a signed byte from memory at rs1 + imm into rd.",
+            "description_zh": "LB:从 rs1 + imm 处的内存加载有符号字节到 rd。"
+        },
+        "LH": {
+            "funct3": "001", "opcode": "0000011",
+            "structure": "rd, imm(rs1)",
+            "description_en": "LH: Loads a signed halfword from memory at rs1 + imm into rd.",
+            "description_zh": "LH:从 rs1 + imm 处的内存加载有符号半字到 rd。"
+        },
+        "LW": {
+            "funct3": "010", "opcode": "0000011",
+            "structure": "rd, imm(rs1)",
+            "description_en": "LW: Loads a word from memory at rs1 + imm into rd.",
+            "description_zh": "LW:从 rs1 + imm 处的内存加载字到 rd。"
+        },
+        "LBU": {
+            "funct3": "100", "opcode": "0000011",
+            "structure": "rd, imm(rs1)",
+            "description_en": "LBU: Loads an unsigned byte from memory at rs1 + imm into rd.",
+            "description_zh": "LBU:从 rs1 + imm 处的内存加载无符号字节到 rd。"
+        },
+        "LHU": {
+            "funct3": "101", "opcode": "0000011",
+            "structure": "rd, imm(rs1)",
+            "description_en": "LHU: Loads an unsigned halfword from memory at rs1 + imm into rd.",
+            "description_zh": "LHU:从 rs1 + imm 处的内存加载无符号半字到 rd。"
+        },
+        "FENCE": {
+            "funct3": "000", "opcode": "0001111",
+            "structure": "pred, succ",
+            "description_en": "FENCE: Orders memory accesses.",
+            "description_zh": "FENCE:对内存访问进行排序。"
+        },
+        "FENCE.I": {
+            "funct3": "001", "opcode": "0001111",
+            "structure": "",
+            "description_en": "FENCE.I: Synchronizes instruction and data streams.",
+            "description_zh": "FENCE.I:同步指令和数据流。"
+        },
+        "JALR": {
+            "funct3": "000", "opcode": "1100111",
+            "structure": "rd, imm(rs1)",
+            "description_en": "JALR: Jumps to rs1 + imm and stores return address in rd.",
+            "description_zh": "JALR:跳转到 rs1 + imm,并将返回地址存入 rd。"
+        },
+        "ECALL": {
+            "funct3": "000", "opcode": "1110011", "imm": "0",
+            "structure": "",
+            "description_en": "ECALL: Makes an environment call.",
+            "description_zh": "ECALL:进行环境调用。"
+        },
+        "EBREAK": {
+            "funct3": "000", "opcode": "1110011", "imm": "1",
+            "structure": "",
+            "description_en": "EBREAK: Causes a breakpoint exception.",
+            "description_zh": "EBREAK:引起断点异常。"
+        },
+    },
+    "S": {
+        "SB": {
+            "funct3": "000", "opcode": "0100011",
+            "structure": "rs2, imm(rs1)",
+            "description_en": "SB: Stores a byte from rs2 to memory at rs1 + imm.",
+            "description_zh": "SB:将 rs2 中的字节存入 rs1 + imm 处的内存。"
+        },
+        "SH": {
+            "funct3": "001", "opcode": "0100011",
+            "structure": "rs2, imm(rs1)",
+            "description_en": "SH: Stores a halfword from rs2 to memory at rs1 + imm.",
+            "description_zh": "SH:将 rs2 中的半字存入 rs1 + imm 处的内存。"
+        },
+        "SW": {
+            "funct3": "010", "opcode": "0100011",
+            "structure": "rs2, imm(rs1)",
+            "description_en": "SW: Stores a word from rs2 to memory at rs1 + imm.",
+            "description_zh": "SW:将 rs2 中的字存入 rs1 + imm 处的内存。"
+        },
+    },
+    "SB": {
+        "BEQ": {
+            "funct3": "000", "opcode": "1100011",
+            "structure": "rs1, rs2, imm",
+            "description_en": "BEQ: Branches if rs1 == rs2 to PC + imm.",
+            "description_zh": "BEQ:如果 rs1 == rs2,则分支到 PC + imm。"
+        },
+        "BNE": {
+            "funct3": "001", "opcode": "1100011",
+            "structure": "rs1, rs2, imm",
+            "description_en": "BNE: Branches if rs1 != rs2 to PC + imm.",
+            "description_zh": "BNE:如果 rs1 != rs2,则分支到 PC + imm。"
+        },
+        "BLT": {
+            "funct3": "100", "opcode": "1100011",
+            "structure": "rs1, rs2, imm",
+            "description_en": "BLT: Branches if rs1 < rs2 (signed) to PC + imm.",
+            "description_zh": "BLT:如果 rs1 < rs2(有符号),则分支到 PC + imm。"
+        },
+        "BGE": {
+            "funct3": "101", "opcode": "1100011",
+            "structure": "rs1, rs2, imm",
+            "description_en": "BGE: Branches if rs1 >= rs2 (signed) to PC + imm.",
+            "description_zh": "BGE:如果 rs1 >= rs2(有符号),则分支到 PC + imm。"
+        },
+        "BLTU": {
+            "funct3": "110", "opcode": "1100011",
+            "structure": "rs1, rs2, imm",
+            "description_en": "BLTU: Branches if rs1 < rs2 (unsigned) to PC + imm.",
+            "description_zh": "BLTU:如果 rs1 < rs2(无符号),则分支到 PC + imm。"
+        },
+        "BGEU": {
+            "funct3": "111", "opcode": "1100011",
+            "structure": "rs1, rs2, imm",
+            "description_en": "BGEU: Branches if rs1 >= rs2 (unsigned) to PC + imm.",
+            "description_zh": "BGEU:如果 rs1 >= rs2(无符号),则分支到 PC + imm。"
+        },
+    },
+    "U": {
+        "LUI": {
+            "opcode": "0110111",
+            "structure": "rd, imm",
+            "description_en": "LUI: Loads upper immediate into rd (upper 20 bits).",
+            "description_zh": "LUI:将上立即数加载到 rd(上 20 位)。"
+        },
+        "AUIPC": {
+            "opcode": "0010111",
+            "structure": "rd, imm",
+            "description_en": "AUIPC: Adds upper immediate to PC, stores in rd.",
+            "description_zh": "AUIPC:将上立即数加到 PC,结果存入 rd。"
+        },
+    },
+    "UJ": {
+        "JAL": {
+            "opcode": "1101111",
+            "structure": "rd, imm",
+            "description_en": "JAL: Jumps to PC + imm and stores return address in rd.",
+            "description_zh": "JAL:跳转到 PC + imm,并将返回地址存入 rd。"
+        },
+    }
+}
+
+# Field order of each instruction type, as passed to the *_type encoders
+FIELD_NAMES = {
+    "R": ["funct7", "rs2", "rs1", "funct3", "rd", "opcode"],
+    "I": ["imm", "rs1", "funct3", "rd", "opcode"],
+    "S": ["imm", "rs2", "rs1", "funct3", "opcode"],
+    "SB": ["imm", "rs2", "rs1", "funct3", "opcode"],
+    "U": ["imm", "rd", "opcode"],
+    "UJ": ["imm", "rd", "opcode"]
+}
 
 def dec_to_bin(value, bits):
     """Convert decimal to binary string with specified bit length."""
@@ -119,6 +420,2194 @@ def process_instruction(instruction_type, fields):
     except ValueError as e:
         return None, f"Error: {str(e)}"
 
+def encode_batch(rows):
+    """Encode (instruction_type, fields) rows into an array of 32-bit words."""
+    words = array("I")
+    for index, (instruction_type, fields) in enumerate(rows):
+        names = FIELD_NAMES.get(instruction_type.upper())
+        if names is not None and len(fields) != len(names):
+            raise ValueError(f"Row {index}: {instruction_type} takes {len(names)} fields ({', '.join(names)}), got {len(fields)}")
+        bin_instruction, hex_instruction = process_instruction(instruction_type, fields)
+        if bin_instruction is None:
+            raise ValueError(f"Row {index}: {hex_instruction}")
+        words.append(int(bin_instruction, 2))
+    return words
+
+def write_outputs(words, hex_path=None, bin_path=None):
+    """Write words as a hex listing (one per line) and/or a little-endian binary image."""
+    if hex_path:
+        with open(hex_path, "wb") as f:
+            f.write(format_hex_lines(np.asarray(words, dtype=np.uint32)))
+    if bin_path:
+        words = array("I", words)
+        if sys.byteorder != "little":
+            words.byteswap()
+        with open(bin_path, "wb") as f:
+            words.tofile(f)
+
+@contextlib.contextmanager
+def file_lock(path):
+    """Hold an exclusive inter-process lock on the given lock file."""
+    with open(path, "a+b") as f:
+        if os.name == "nt":
+            import msvcrt
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+class EncodingCache:
+    """Content-addressed on-disk cache of encoded chunks, shared across processes and runs.
+
+    Each entry is a raw little-endian word blob named after the SHA-256 of the
+    converter version, the extension set and either the parsed chunk rows or
+    the raw source bytes of the chunk. Entries are evicted least-recently-used
+    first once the directory exceeds max_bytes; temporary files left by
+    interrupted writes count towards the budget and are removed once stale.
+    """
+
+    def __init__(self, directory=CACHE_DIR, max_bytes=CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+        self.lock_path = os.path.join(directory, ".lock")
+        self.usage_path = os.path.join(directory, ".usage")
+
+    def key(self, rows):
+        """Return the cache key for a chunk of (instruction_type, fields) rows."""
+        digest = hashlib.sha256()
+        digest.update(f"{CONVERTER_VERSION}|{','.join(EXTENSIONS)}\n".encode())
+        for instruction_type, fields in rows:
+            digest.update(f"{instruction_type.upper()}|{','.join(str(field).strip() for field in fields)}\n".encode())
+        return digest.hexdigest()
+
+    def source_key(self, data):
+        """Return the cache key for a chunk of raw batch CSV bytes, so hits skip parsing."""
+        digest = hashlib.sha256()
+        digest.update(f"{CONVERTER_VERSION}|{','.join(EXTENSIONS)}|source\n".encode())
+        digest.update(data)
+        return digest.hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.directory, key + ".bin")
+
+    def get(self, key):
+        """Return the cached words for key as a read-only view, or None on a miss."""
+        path = self.path(key)
+        try:
+            f = open(path, "rb")
+        except FileNotFoundError:
+            return None
+        with f:
+            size = os.fstat(f.fileno()).st_size
+            # Bump the mtime so eviction treats this entry as recently used
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+            if size == 0:
+                return array("I")
+            blob = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if sys.byteorder != "little":
+            words = array("I", blob)
+            words.byteswap()
+            return words
+        return memoryview(blob).cast("I")
+
+    def put(self, key, words):
+        """Store words under key, then evict old entries if the cache is over budget."""
+        words = array("I", words)
+        if sys.byteorder != "little":
+            words.byteswap()
+        path = self.path(key)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                words.tofile(f)
+            with file_lock(self.lock_path):
+                try:
+                    replaced = os.stat(path).st_size
+                except FileNotFoundError:
+                    replaced = 0
+                os.replace(tmp_path, path)
+                # Keep a running total so a put does not have to scan the whole directory
+                usage = self._read_usage()
+                if usage is None or time.time() - usage[1] > CACHE_RESCAN_INTERVAL:
+                    self.evict()
+                else:
+                    total = usage[0] + 4 * len(words) - replaced
+                    if total > self.max_bytes:
+                        self.evict()
+                    else:
+                        self._write_usage(total, usage[1])
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _read_usage(self):
+        """Return (total bytes, time of the last full scan) from the usage file, or None."""
+        try:
+            with open(self.usage_path) as f:
+                total, scanned = f.read().split()
+            return int(total), float(scanned)
+        except (OSError, ValueError):
+            return None
+
+    def _write_usage(self, total, scanned):
+        with open(self.usage_path, "w") as f:
+            f.write(f"{total} {scanned}\n")
+
+    def evict(self):
+        """Remove stale temporary files and, if over max_bytes, least-recently-used entries down to 90% of it.
+
+        Scans the whole directory and records the exact total in the usage
+        file; callers must hold the cache lock.
+        """
+        entries = []
+        total = 0
+        stale = time.time_ns() - int(CACHE_TMP_GRACE * 1e9)
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if not entry.name.endswith((".bin", ".tmp")):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                total += stat.st_size
+                if entry.name.endswith(".bin"):
+                    entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+                elif stat.st_mtime_ns < stale:
+                    # Left behind by a put that was interrupted
+                    try:
+                        os.remove(entry.path)
+                        total -= stat.st_size
+                    except OSError:
+                        pass
+        if total > self.max_bytes:
+            target = self.max_bytes * CACHE_EVICT_TARGET
+            entries.sort()
+            for _, size, path in entries:
+                if total <= target:
+                    break
+                try:
+                    os.remove(path)
+                    total -= size
+                except OSError:
+                    # Still mapped by a reader on Windows, or already removed by another process
+                    pass
+        self._write_usage(total, time.time())
+
+def cached_encode_batch(rows, cache=None, chunk_size=CACHE_CHUNK_SIZE):
+    """Encode rows chunk by chunk, reusing chunks already present in the on-disk cache."""
+    rows = list(rows)
+    if cache is None:
+        return encode_batch(rows)
+    words = array("I")
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start:start + chunk_size]
+        key = cache.key(chunk)
+        cached = cache.get(key)
+        if cached is None:
+            try:
+                encoded = encode_batch(chunk)
+            except ValueError as e:
+                raise ValueError(f"Chunk at row {start}: {e}")
+            cache.put(key, encoded)
+            words.extend(encoded)
+        else:
+            words.frombytes(memoryview(cached).cast("B"))
+    return words
+
+def parse_batch_lines(lines):
+    """Parse batch CSV lines into (instruction_type, fields) rows, skipping blanks and comments."""
+    rows = []
+    for line in csv.reader(lines):
+        if not line or line[0].strip().startswith("#"):
+            continue
+        rows.append((line[0].strip(), [field.strip() for field in line[1:]]))
+    return rows
+
+def read_batch_csv(path):
+    """Read batch rows from a CSV file: instruction type followed by its fields in GUI order."""
+    with open(path, newline="") as f:
+        return parse_batch_lines(f)
+
+def iter_source_chunks(f, chunk_size=CACHE_CHUNK_SIZE):
+    """Yield lists of raw lines from f, cut at content-defined boundaries.
+
+    A chunk ends after a line whose CRC is a multiple of chunk_size, so
+    chunks average about chunk_size lines (between a quarter and four times
+    that). Boundaries depend only on nearby lines, so inserting or deleting a
+    line changes the chunks around it and leaves later chunks as they were.
+    """
+    lines = []
+    min_lines = max(1, chunk_size // 4)
+    for line in f:
+        lines.append(line)
+        if len(lines) >= min_lines and (zlib.crc32(line) % chunk_size == 0 or len(lines) >= 4 * chunk_size):
+            yield lines
+            lines = []
+    if lines:
+        yield lines
+
+def cached_encode_file(path, cache, chunk_size=CACHE_CHUNK_SIZE):
+    """Encode a batch CSV file, keying cache entries on raw chunks of source lines.
+
+    Chunks are hashed before they are parsed, so on a warm cache the file is
+    only read and hashed; only chunks whose bytes changed are parsed and encoded.
+    """
+    words = array("I")
+    with open(path, "rb") as f:
+        first_line = 1
+        for lines in iter_source_chunks(f, chunk_size):
+            data = b"".join(lines)
+            key = cache.source_key(data)
+            cached = cache.get(key)
+            if cached is None:
+                try:
+                    encoded = encode_batch(parse_batch_lines(data.decode("utf-8").splitlines()))
+                except (ValueError, UnicodeDecodeError) as e:
+                    raise ValueError(f"Chunk at line {first_line}: {e}")
+                cache.put(key, encoded)
+                words.extend(encoded)
+            else:
+                words.frombytes(memoryview(cached).cast("B"))
+            first_line += len(lines)
+    return words
+
+def read_image(path):
+    """Read a little-endian binary image into an array of 32-bit words."""
+    with open(path, "rb") as f:
+        data = f.read()
+    if len(data) % 4:
+        raise ValueError(f"{path}: image size {len(data)} is not a multiple of 4 bytes")
+    words = array("I", data)
+    if sys.byteorder != "little":
+        words.byteswap()
+    return words
+
+def build_decode_index(instructions=INSTRUCTIONS):
+    """Index instruction descriptions by (opcode, funct3) for decoding.
+
+    U and UJ instructions have no funct3 and are indexed under (opcode, None).
+    Each entry is a list of (instruction_type, mnemonic, data) candidates that
+    are told apart by funct7 or a fixed immediate.
+    """
+    index = {}
+    for inst_type, group in instructions.items():
+        for mnemonic, data in group.items():
+            funct3 = int(data["funct3"], 2) if "funct3" in data else None
+            index.setdefault((int(data["opcode"], 2), funct3), []).append((inst_type, mnemonic, data))
+    return index
+
+DECODE_INDEX = build_decode_index()
+
+# Raw (unsigned) immediate of each format, as the *_type encoders take it
+IMM_DECODERS = {
+    "I": lambda word: word >> 20,
+    "S": lambda word: ((word >> 25) << 5) | ((word >> 7) & 0x1F),
+    "SB": lambda word: ((word >> 31) << 12) | (((word >> 7) & 0x1) << 11) | (((word >> 25) & 0x3F) << 5) | (((word >> 8) & 0xF) << 1),
+    "U": lambda word: word >> 12,
+    "UJ": lambda word: ((word >> 31) << 20) | (((word >> 12) & 0xFF) << 12) | (((word >> 20) & 0x1) << 11) | (((word >> 21) & 0x3FF) << 1),
+}
+
+def decode_word(word, index=DECODE_INDEX):
+    """Decode a 32-bit word into (instruction_type, mnemonic, fields).
+
+    Fields are strings in FIELD_NAMES order, exactly as the *_type encoders take
+    them, so process_instruction(inst_type, fields) re-encodes the same word.
+    """
+    opcode = word & 0x7F
+    funct3 = (word >> 12) & 0x7
+    candidates = index.get((opcode, funct3)) or index.get((opcode, None))
+    if not candidates:
+        raise ValueError(f"Unknown instruction 0x{word:08x}")
+    funct7 = word >> 25
+    for inst_type, mnemonic, data in candidates:
+        if "funct7" in data and int(data["funct7"], 2) != funct7:
+            continue
+        if "imm" in data and int(data["imm"]) != word >> 20:
+            continue
+        break
+    else:
+        raise ValueError(f"Unknown instruction 0x{word:08x}")
+
+    rd = (word >> 7) & 0x1F
+    rs1 = (word >> 15) & 0x1F
+    rs2 = (word >> 20) & 0x1F
+    if inst_type == "R":
+        fields = [f"{funct7:07b}", rs2, rs1, f"{funct3:03b}", rd]
+    elif inst_type == "I":
+        fields = [word >> 20, rs1, f"{funct3:03b}", rd]
+    elif inst_type in ("S", "SB"):
+        fields = [IMM_DECODERS[inst_type](word), rs2, rs1, f"{funct3:03b}"]
+    else:
+        fields = [IMM_DECODERS[inst_type](word), rd]
+    fields = [str(field) for field in fields] + [f"{opcode:07b}"]
+    return inst_type, mnemonic, fields
+
+# Sign bit of the immediate as the encoders take it (U-type immediates are shown unsigned)
+IMM_BITS = {"I": 12, "S": 12, "SB": 13, "UJ": 21}
+
+def sign_extend(value, bits):
+    """Interpret the low bits of value as a two's complement number."""
+    value &= (1 << bits) - 1
+    return value - (1 << bits) if value >> (bits - 1) else value
+
+def display_imm(inst_type, data, imm):
+    """Turn a raw immediate into the value shown in assembly (signed, or the shift amount)."""
+    if inst_type == "I" and "funct7" in data:
+        return imm & 0x1F
+    if inst_type in IMM_BITS:
+        return sign_extend(imm, IMM_BITS[inst_type])
+    return imm
+
+def format_instruction(inst_type, mnemonic, fields):
+    """Format decoded fields as assembly text following the instruction's structure."""
+    data = INSTRUCTIONS[inst_type][mnemonic]
+    values = dict(zip(FIELD_NAMES[inst_type], fields))
+    operands = {name: f"x{values[name]}" for name in ("rd", "rs1", "rs2") if name in values}
+    if "imm" in values:
+        imm = display_imm(inst_type, data, int(values["imm"]))
+        operands["imm"] = str(imm)
+        operands["pred"] = str((imm >> 4) & 0xF)
+        operands["succ"] = str(imm & 0xF)
+    structure = re.sub(r"rd|rs1|rs2|imm|pred|succ", lambda m: operands[m.group(0)], data["structure"])
+    return f"{mnemonic.lower()} {structure}".rstrip()
+
+def disassemble_word(word):
+    """Return the assembly text of a word, or a .word directive if it does not decode."""
+    try:
+        return format_instruction(*decode_word(word))
+    except ValueError:
+        return f".word 0x{word:08x}"
+
+OPERAND_PATTERN = re.compile(r"rd|rs1|rs2|imm|pred|succ")
+DISASSEMBLY_MEMO_SIZE = 1 << 20
+DISASSEMBLY_BLOCK_WORDS = 1 << 16
+
+def _compile_formatter(word):
+    """Build a function that formats any word sharing this word's opcode, funct3 and funct7."""
+    candidates = DECODE_INDEX.get((word & 0x7F, (word >> 12) & 0x7), ())
+    if any("imm" in data for _, _, data in candidates):
+        # ECALL/EBREAK are told apart by immediate bits outside the key
+        return disassemble_word
+    try:
+        inst_type, mnemonic, _ = decode_word(word)
+    except ValueError:
+        return lambda word: f".word 0x{word:08x}"
+    data = INSTRUCTIONS[inst_type][mnemonic]
+    decode_imm = IMM_DECODERS.get(inst_type)
+    getters = {
+        "rd": lambda word: f"x{(word >> 7) & 0x1F}",
+        "rs1": lambda word: f"x{(word >> 15) & 0x1F}",
+        "rs2": lambda word: f"x{(word >> 20) & 0x1F}",
+        "imm": lambda word: str(display_imm(inst_type, data, decode_imm(word))),
+        "pred": lambda word: str((word >> 24) & 0xF),
+        "succ": lambda word: str((word >> 20) & 0xF),
+    }
+    parts = [getters[name] for name in OPERAND_PATTERN.findall(data["structure"])]
+    template = f"{mnemonic.lower()} {OPERAND_PATTERN.sub('{}', data['structure'])}".rstrip()
+    return lambda word: template.format(*[part(word) for part in parts])
+
+def build_disassembler():
+    """Return a fast disassemble(word) function with the same output as disassemble_word.
+
+    Decoding depends only on the opcode, funct3 and funct7 bits, so a formatter
+    is compiled once per distinct combination and reused for every later word.
+    """
+    formatters = {}
+    # Real code repeats the same words a lot, so also remember recent results
+    texts = {}
+
+    def disassemble(word):
+        text = texts.get(word)
+        if text is None:
+            key = word & 0xFE00707F
+            formatter = formatters.get(key)
+            if formatter is None:
+                formatter = formatters[key] = _compile_formatter(word)
+            if len(texts) >= DISASSEMBLY_MEMO_SIZE:
+                texts.clear()
+            text = texts[word] = formatter(word)
+        return text
+
+    return disassemble
+
+def verify_roundtrip(words):
+    """Decode and re-encode every word; return the index of the first mismatch or None."""
+    for index, word in enumerate(words):
+        try:
+            inst_type, _, fields = decode_word(word)
+        except ValueError:
+            return index
+        bin_instruction, _ = process_instruction(inst_type, fields)
+        if bin_instruction is None or int(bin_instruction, 2) != word:
+            return index
+    return None
+
+MASK32 = 0xFFFFFFFF
+
+def _signed(value):
+    return value - ((value & 0x80000000) << 1)
+
+ALU_OPS = {
+    "ADD": lambda a, b: (a + b) & MASK32,
+    "SUB": lambda a, b: (a - b) & MASK32,
+    "SLL": lambda a, b: (a << (b & 0x1F)) & MASK32,
+    "SLT": lambda a, b: int(_signed(a) < _signed(b)),
+    "SLTU": lambda a, b: int(a < b),
+    "XOR": lambda a, b: a ^ b,
+    "SRL": lambda a, b: a >> (b & 0x1F),
+    "SRA": lambda a, b: (_signed(a) >> (b & 0x1F)) & MASK32,
+    "OR": lambda a, b: a | b,
+    "AND": lambda a, b: a & b,
+}
+
+# Register-immediate ALU instructions and the register-register operation they share
+IMMEDIATE_ALU_OPS = {
+    "ADDI": "ADD", "SLTI": "SLT", "SLTIU": "SLTU", "XORI": "XOR", "ORI": "OR",
+    "ANDI": "AND", "SLLI": "SLL", "SRLI": "SRL", "SRAI": "SRA",
+}
+
+BRANCH_OPS = {
+    "BEQ": lambda a, b: a == b,
+    "BNE": lambda a, b: a != b,
+    "BLT": lambda a, b: _signed(a) < _signed(b),
+    "BGE": lambda a, b: _signed(a) >= _signed(b),
+    "BLTU": lambda a, b: a < b,
+    "BGEU": lambda a, b: a >= b,
+}
+
+# struct formats for loads and stores
+LOAD_FORMATS = {"LB": "<b", "LH": "<h", "LW": "<I", "LBU": "<B", "LHU": "<H"}
+STORE_FORMATS = {"SB": "<B", "SH": "<H", "SW": "<I"}
+
+class SimulatorHalt(Exception):
+    """Raised by ECALL and EBREAK to stop RV32ISimulator.run."""
+
+class RV32ISimulator:
+    """Lightweight RV32I interpreter for checking encoded programs.
+
+    Memory is predecoded lazily into a list with one slot per word. Every slot
+    starts out as a trampoline that decodes the word at that PC into a closure,
+    puts the closure in the slot and runs it; closures take the PC and return
+    the next one. A store puts the trampoline back in the slots it overwrites.
+    ECALL and EBREAK stop the simulation by raising SimulatorHalt.
+    """
+
+    def __init__(self, words, memory_size=1 << 20, base=0):
+        self.memory = bytearray(memory_size)
+        # Every write is masked to 32 bits, so a plain list is safe and faster to index than an array
+        self.regs = [0] * 32
+        self.pc = base
+        self.base = base
+        self.ops = [self._trampoline] * (memory_size >> 2)
+        self.instruction_count = 0
+        self.pc_counts = Counter()
+        self.halt_reason = None
+        image = array("I", words)
+        if sys.byteorder != "little":
+            image.byteswap()
+        image = image.tobytes()
+        if base < 0 or base + len(image) > memory_size:
+            raise ValueError("Program does not fit in simulator memory")
+        if base % 4:
+            raise ValueError(f"Base address 0x{base:x} is not word aligned")
+        self.memory[base:base + len(image)] = image
+
+    def _trampoline(self, pc):
+        op = self.ops[pc >> 2] = self._compile(pc)
+        return op(pc)
+
+    def _compile(self, pc):
+        """Decode the word at pc into a closure that executes it."""
+        if pc % 4 or pc + 4 > len(self.memory):
+            raise ValueError(f"PC 0x{pc:08x} is {'misaligned' if pc % 4 else 'outside simulator memory'}")
+        (word,) = struct.unpack_from("<I", self.memory, pc)
+        try:
+            inst_type, mnemonic, fields = decode_word(word)
+        except ValueError as e:
+            raise ValueError(f"PC 0x{pc:08x}: {e}")
+        values = {name: int(value, 2) if name in ("funct7", "funct3", "opcode") else int(value)
+                  for name, value in zip(FIELD_NAMES[inst_type], fields)}
+        regs = self.regs
+        memory = self.memory
+        ops = self.ops
+        trampoline = self._trampoline
+        next_pc = pc + 4
+        rd = values.get("rd", 0)
+        rs1 = values.get("rs1", 0)
+        rs2 = values.get("rs2", 0)
+        imm = values.get("imm", 0)
+        if inst_type in IMM_BITS:
+            imm = sign_extend(imm, IMM_BITS[inst_type])
+
+        def nop(pc):
+            return next_pc
+
+        if inst_type == "R":
+            fn = ALU_OPS[mnemonic]
+            if rd == 0:
+                op = nop
+            elif mnemonic == "ADD":
+                def op(pc):
+                    regs[rd] = (regs[rs1] + regs[rs2]) & MASK32
+                    return next_pc
+            else:
+                def op(pc):
+                    regs[rd] = fn(regs[rs1], regs[rs2])
+                    return next_pc
+        elif mnemonic in LOAD_FORMATS:
+            load = struct.Struct(LOAD_FORMATS[mnemonic]).unpack_from
+
+            def op(pc):
+                (value,) = load(memory, (regs[rs1] + imm) & MASK32)
+                if rd:
+                    regs[rd] = value & MASK32
+                return next_pc
+        elif mnemonic == "JALR":
+            def op(pc):
+                target = (regs[rs1] + imm) & ~1 & MASK32
+                if target & 3:
+                    raise ValueError(f"JALR at PC 0x{pc:08x} jumps to misaligned address 0x{target:08x}")
+                if rd:
+                    regs[rd] = next_pc & MASK32
+                return target
+        elif mnemonic in ("ECALL", "EBREAK"):
+            def op(pc):
+                self.halt_reason = mnemonic
+                raise SimulatorHalt(mnemonic)
+        elif mnemonic in ("FENCE", "FENCE.I"):
+            op = nop
+        elif inst_type == "I":
+            fn = ALU_OPS[IMMEDIATE_ALU_OPS[mnemonic]]
+            operand = (imm & 0x1F) if "funct7" in INSTRUCTIONS["I"][mnemonic] else imm & MASK32
+            if rd == 0:
+                op = nop
+            elif mnemonic == "ADDI":
+                # The most common instruction by far, so it gets the addition inline
+                def op(pc):
+                    regs[rd] = (regs[rs1] + operand) & MASK32
+                    return next_pc
+            else:
+                def op(pc):
+                    regs[rd] = fn(regs[rs1], operand)
+                    return next_pc
+        elif inst_type == "S":
+            store = struct.Struct(STORE_FORMATS[mnemonic])
+            value_mask = (1 << (8 * store.size)) - 1
+
+            def op(pc):
+                address = (regs[rs1] + imm) & MASK32
+                store.pack_into(memory, address, regs[rs2] & value_mask)
+                # Decode again any instruction this store may have overwritten
+                ops[address >> 2] = trampoline
+                ops[(address + store.size - 1) >> 2] = trampoline
+                return next_pc
+        elif inst_type in ("SB", "UJ") and (pc + imm) & 3:
+            def op(pc):
+                raise ValueError(f"{mnemonic} at PC 0x{pc:08x} jumps to misaligned address 0x{(pc + imm) & MASK32:08x}")
+        elif inst_type == "SB":
+            target = (pc + imm) & MASK32
+            if mnemonic == "BNE":
+                def op(pc):
+                    return target if regs[rs1] != regs[rs2] else next_pc
+            elif mnemonic == "BEQ":
+                def op(pc):
+                    return target if regs[rs1] == regs[rs2] else next_pc
+            else:
+                fn = BRANCH_OPS[mnemonic]
+
+                def op(pc):
+                    return target if fn(regs[rs1], regs[rs2]) else next_pc
+        elif inst_type == "U":
+            value = (imm << 12) & MASK32
+            if mnemonic == "AUIPC":
+                value = (pc + value) & MASK32
+            if rd == 0:
+                op = nop
+            else:
+                def op(pc):
+                    regs[rd] = value
+                    return next_pc
+        else:
+            target = (pc + imm) & MASK32
+
+            def op(pc):
+                if rd:
+                    regs[rd] = next_pc & MASK32
+                return target
+        return op
+
+    def run(self, max_steps=10_000_000, profile=False):
+        """Run until ECALL/EBREAK or max_steps; return the number of instructions executed."""
+        ops = self.ops
+        pc = self.pc
+        steps = 0
+        counts = [0] * len(ops) if profile else None
+        try:
+            if profile:
+                for steps in range(1, max_steps + 1):
+                    index = pc >> 2
+                    counts[index] += 1
+                    pc = ops[index](pc)
+            else:
+                for steps in range(1, max_steps + 1):
+                    pc = ops[pc >> 2](pc)
+        except SimulatorHalt:
+            pass
+        except IndexError:
+            steps -= 1
+            raise ValueError(f"PC 0x{pc:08x} is outside simulator memory")
+        except struct.error:
+            steps -= 1
+            raise ValueError(f"Memory access out of range at PC 0x{pc:08x}")
+        except ValueError:
+            steps -= 1
+            raise
+        finally:
+            self.pc = pc
+            self.instruction_count += steps
+            if profile:
+                self.pc_counts.update({index << 2: hits for index, hits in enumerate(counts) if hits})
+        return steps
+
+    def hot_pcs(self, count=10):
+        """Return the most executed (pc, hits, disassembly) entries from a profiled run."""
+        hot = []
+        for pc, hits in self.pc_counts.most_common(count):
+            (word,) = struct.unpack_from("<I", self.memory, pc)
+            hot.append((pc, hits, disassemble_word(word)))
+        return hot
+
+# Immediate widths used by the *_type encoders
+IMM_WIDTHS = {"I": 12, "S": 12, "SB": 13, "U": 20, "UJ": 21}
+FORMAT_CODES = {inst_type: code for code, inst_type in enumerate(FIELD_NAMES)}
+GENERATOR_CHUNK_SIZE = 1 << 20
+
+def build_generator_tables(instructions=INSTRUCTIONS):
+    """Build per-mnemonic arrays describing which operand bits may be randomized.
+
+    For every mnemonic this records its format, the word with opcode, funct3 and
+    funct7 already filled in, and the masks and fixed bits applied to random
+    register and immediate values so that each generated instruction is valid.
+    """
+    mnemonics, formats, templates = [], [], []
+    reg_masks, imm_masks, imm_fixed = [], [], []
+    for inst_type, group in instructions.items():
+        for mnemonic, data in group.items():
+            template = int(data["opcode"], 2) | (int(data.get("funct3", "0"), 2) << 12)
+            reg_mask, mask, fixed = 0x1F, 0, 0
+            if inst_type == "R":
+                template |= int(data["funct7"], 2) << 25
+            elif "funct7" in data:
+                # Shift immediates carry funct7 in their upper bits
+                mask, fixed = 0x1F, int(data["funct7"], 2) << 5
+            elif "imm" in data:
+                reg_mask, fixed = 0, int(data["imm"])
+            elif mnemonic == "FENCE":
+                reg_mask, mask = 0, 0xFF
+            elif mnemonic == "FENCE.I":
+                reg_mask = 0
+            elif inst_type in ("SB", "UJ"):
+                # Branch and jump offsets are even; bit 0 is not encoded
+                mask = (1 << IMM_WIDTHS[inst_type]) - 2
+            else:
+                mask = (1 << IMM_WIDTHS[inst_type]) - 1
+            mnemonics.append(mnemonic)
+            formats.append(FORMAT_CODES[inst_type])
+            templates.append(template)
+            reg_masks.append(reg_mask)
+            imm_masks.append(mask)
+            imm_fixed.append(fixed)
+    return {
+        "mnemonics": mnemonics,
+        "formats": np.array(formats, dtype=np.uint8),
+        "templates": np.array(templates, dtype=np.uint32),
+        "reg_masks": np.array(reg_masks, dtype=np.uint32),
+        "imm_masks": np.array(imm_masks, dtype=np.uint32),
+        "imm_fixed": np.array(imm_fixed, dtype=np.uint32),
+    }
+
+GENERATOR_TABLES = build_generator_tables()
+
+def pack_words(formats, templates, rd, rs1, rs2, imm):
+    """Vectorized encoder: place register and immediate fields into template words.
+
+    All arguments are equal-length uint32 numpy arrays (formats holds FORMAT_CODES);
+    immediates are raw unsigned values as taken by the *_type encoders.
+    """
+    regs = (rs1 << 15) | (rs2 << 20)
+    placed = np.select(
+        [formats == FORMAT_CODES["R"], formats == FORMAT_CODES["I"], formats == FORMAT_CODES["S"],
+         formats == FORMAT_CODES["SB"], formats == FORMAT_CODES["U"]],
+        [(rd << 7) | regs,
+         (rd << 7) | (rs1 << 15) | (imm << 20),
+         ((imm & 0x1F) << 7) | regs | ((imm >> 5) << 25),
+         (((imm >> 11) & 0x1) << 7) | (((imm >> 1) & 0xF) << 8) | regs | (((imm >> 5) & 0x3F) << 25) | (((imm >> 12) & 0x1) << 31),
+         (rd << 7) | (imm << 12)],
+        (rd << 7) | (((imm >> 12) & 0xFF) << 12) | (((imm >> 11) & 0x1) << 20) | (((imm >> 1) & 0x3FF) << 21) | (((imm >> 20) & 0x1) << 31),
+    )
+    return (templates | placed).astype(np.uint32)
+
+def parse_mix(text, tables=GENERATOR_TABLES):
+    """Parse a mnemonic mix such as "ADD=5,LW=2,BEQ=1" into per-mnemonic weights."""
+    mnemonics = tables["mnemonics"]
+    if not text:
+        return [1.0] * len(mnemonics)
+    weights = [0.0] * len(mnemonics)
+    for item in text.split(","):
+        name, _, weight = item.partition("=")
+        name = name.strip().upper()
+        if name not in mnemonics:
+            raise ValueError(f"Unknown mnemonic in mix: {name}")
+        try:
+            value = float(weight) if weight else 1.0
+        except ValueError:
+            value = math.nan
+        if not math.isfinite(value) or value < 0:
+            raise ValueError(f"Weight for {name} in mix must be a finite number >= 0, got {weight.strip()!r}")
+        weights[mnemonics.index(name)] = value
+    if sum(weights) <= 0:
+        raise ValueError("Mnemonic mix must have a positive total weight")
+    return weights
+
+def generate_chunk(seed, chunk_index, count, weights, tables=GENERATOR_TABLES):
+    """Generate count random valid instruction words for one chunk.
+
+    The chunk's random stream depends only on (seed, chunk_index), so output is
+    identical however chunks are spread over workers.
+    """
+    rng = np.random.Generator(np.random.PCG64(np.random.SeedSequence([seed, chunk_index])))
+    probabilities = np.asarray(weights, dtype=np.float64)
+    probabilities /= probabilities.sum()
+    choice = rng.choice(len(probabilities), size=count, p=probabilities)
+    reg_mask = tables["reg_masks"][choice]
+    rd = rng.integers(0, 32, size=count, dtype=np.uint32) & reg_mask
+    rs1 = rng.integers(0, 32, size=count, dtype=np.uint32) & reg_mask
+    rs2 = rng.integers(0, 32, size=count, dtype=np.uint32)
+    imm = (rng.integers(0, 1 << 32, size=count, dtype=np.uint32) & tables["imm_masks"][choice]) | tables["imm_fixed"][choice]
+    return pack_words(tables["formats"][choice], tables["templates"][choice], rd, rs1, rs2, imm)
+
+HEX_DIGITS = np.frombuffer(b"0123456789abcdef", dtype=np.uint8)
+
+def format_hex_lines(words):
+    """Render uint32 words as "0x%08x\\n" lines without a per-word Python loop."""
+    lines = np.empty((len(words), 11), dtype=np.uint8)
+    lines[:, 0] = ord("0")
+    lines[:, 1] = ord("x")
+    for digit in range(8):
+        lines[:, 2 + digit] = HEX_DIGITS[(words >> (28 - 4 * digit)) & 0xF]
+    lines[:, 10] = ord("\n")
+    return lines.tobytes()
+
+def _generate_chunk_job(job):
+    return generate_chunk(*job)
+
+def generate_instructions(count, seed=0, weights=None, hex_path=None, bin_path=None,
+                          workers=1, chunk_size=GENERATOR_CHUNK_SIZE):
+    """Stream count random instructions to hex and/or binary outputs.
+
+    Chunks are generated in windows of a few per worker, so memory stays bounded
+    by the chunk size no matter how many instructions are requested.
+    """
+    if weights is None:
+        weights = parse_mix(None)
+    jobs = [(seed, index, min(chunk_size, count - start), weights)
+            for index, start in enumerate(range(0, count, chunk_size))]
+    window = max(1, workers) * 2
+    with contextlib.ExitStack() as stack:
+        hex_file = stack.enter_context(open(hex_path, "wb")) if hex_path else None
+        bin_file = stack.enter_context(open(bin_path, "wb")) if bin_path else None
+        pool = stack.enter_context(multiprocessing.Pool(workers)) if workers > 1 else None
+        for start in range(0, len(jobs), window):
+            batch = jobs[start:start + window]
+            chunks = pool.map(_generate_chunk_job, batch) if pool else map(_generate_chunk_job, batch)
+            for words in chunks:
+                if hex_file:
+                    hex_file.write(format_hex_lines(words))
+                if bin_file:
+                    bin_file.write(words.astype("<u4").tobytes())
+
+VERIFY_CHUNK_SIZE = 4096
+
+def _case(inst_type, mnemonic, rd=0, rs1=0, rs2=0, imm=0):
+    """Build a verification case with fields in encoder order."""
+    data = INSTRUCTIONS[inst_type][mnemonic]
+    values = {"rd": rd, "rs1": rs1, "rs2": rs2, "imm": imm}
+    fields = [data[name] if name in ("funct7", "funct3", "opcode") else str(values[name])
+              for name in FIELD_NAMES[inst_type]]
+    return inst_type, mnemonic, fields
+
+def verification_cases(samples=20000, seed=0, tables=GENERATOR_TABLES):
+    """Yield (instruction_type, mnemonic, fields) cases covering every mnemonic.
+
+    Register fields are swept exhaustively (all rd/rs1/rs2 triples for R-type,
+    all pairs otherwise) and immediates of up to 13 bits over every valid value.
+    The 20- and 21-bit U/UJ immediates get their edge values plus random samples.
+    """
+    rnd = random.Random(seed)
+    index = 0
+    for inst_type, group in INSTRUCTIONS.items():
+        for mnemonic in group:
+            reg_mask = int(tables["reg_masks"][index])
+            imm_mask = int(tables["imm_masks"][index])
+            imm_fixed = int(tables["imm_fixed"][index])
+            index += 1
+
+            def random_imm():
+                return (rnd.getrandbits(32) & imm_mask) | imm_fixed
+
+            if inst_type == "R":
+                for rd, rs1, rs2 in itertools.product(range(32), repeat=3):
+                    yield _case(inst_type, mnemonic, rd, rs1, rs2)
+                continue
+            for a, b in itertools.product(range(reg_mask + 1), repeat=2):
+                rd, rs1, rs2 = (0, a, b) if inst_type in ("S", "SB") else (a, b, rnd.getrandbits(5))
+                yield _case(inst_type, mnemonic, rd, rs1, rs2, random_imm())
+            if imm_mask < 1 << 13:
+                imms = [value | imm_fixed for value in range(imm_mask + 1) if value & imm_mask == value]
+            else:
+                edges = [0, imm_mask, imm_mask >> 1, (imm_mask >> 1) + 1]
+                edges += [1 << bit for bit in range(imm_mask.bit_length())]
+                imms = [(edge & imm_mask) | imm_fixed for edge in edges] + [random_imm() for _ in range(samples)]
+            for imm in imms:
+                yield _case(inst_type, mnemonic, rnd.getrandbits(5) & reg_mask,
+                            rnd.getrandbits(5) & reg_mask, rnd.getrandbits(5), imm)
+
+def _failing_case(path, cases, items, encode):
+    """Encode the items one at a time and report the case of the first that raises ValueError."""
+    for case, item in zip(cases, items):
+        try:
+            encode([item])
+        except ValueError as e:
+            return {"path": path, "case": case, "expected": "a valid encoding", "actual": str(e)}
+    return {"path": path, "case": cases[0], "expected": "a valid encoding",
+            "actual": "ValueError for the whole batch but for no single case"}
+
+def check_cases(cases, cache_dir, tables=GENERATOR_TABLES):
+    """Run cases through every encoding path; return the first divergence or None.
+
+    The reference is process_instruction (the string encoders and bin_to_hex).
+    It is compared against encode_batch, cached_encode_batch and
+    cached_encode_file on a cache miss and on a hit, the vectorized pack_words,
+    the assembler's encode_instructions, format_hex_lines, decode_word and
+    format_disassembly (against disassemble_word).
+    """
+    expected = []
+    expected_hex = []
+    for case in cases:
+        bin_instruction, hex_instruction = process_instruction(case[0], case[2])
+        if bin_instruction is None:
+            return {"path": "reference", "case": case, "expected": "a valid encoding", "actual": hex_instruction}
+        expected.append(int(bin_instruction, 2))
+        expected_hex.append(hex_instruction)
+
+    def first_mismatch(path, actual, show=lambda word: f"0x{word:08x}"):
+        for i, (want, got) in enumerate(zip(expected, actual)):
+            if want != got:
+                return {"path": path, "case": cases[i], "expected": show(want), "actual": show(got)}
+        if len(actual) != len(expected):
+            return {"path": path, "case": cases[min(len(actual), len(expected) - 1)],
+                    "expected": f"{len(expected)} words", "actual": f"{len(actual)} words"}
+        return None
+
+    rows = [(inst_type, fields) for inst_type, _, fields in cases]
+    cache = EncodingCache(cache_dir)
+    # Workers share cache_dir, so each writes its cases to its own CSV file
+    with tempfile.NamedTemporaryFile("w", newline="", suffix=".csv", dir=cache_dir, delete=False) as f:
+        csv.writer(f).writerows([inst_type] + fields for inst_type, fields in rows)
+    batch_paths = [("encode_batch", lambda: encode_batch(rows))]
+    for state in ("miss", "hit"):
+        batch_paths.append((f"cached_encode_batch ({state})", lambda: cached_encode_batch(rows, cache, chunk_size=256)))
+    for state in ("miss", "hit"):
+        batch_paths.append((f"cached_encode_file ({state})", lambda: cached_encode_file(f.name, cache, chunk_size=256)))
+    try:
+        for path, encode in batch_paths:
+            try:
+                divergence = first_mismatch(path, encode())
+            except ValueError:
+                return _failing_case(path, cases, rows, encode_batch)
+            if divergence:
+                return divergence
+    finally:
+        os.remove(f.name)
+
+    positions = {mnemonic: i for i, mnemonic in enumerate(tables["mnemonics"])}
+    choice = np.array([positions[mnemonic] for _, mnemonic, _ in cases])
+    operands = {name: np.zeros(len(cases), dtype=np.uint32) for name in ("rd", "rs1", "rs2", "imm")}
+    for i, (inst_type, _, fields) in enumerate(cases):
+        for name, value in zip(FIELD_NAMES[inst_type], fields):
+            if name in operands:
+                operands[name][i] = int(value)
+    packed = pack_words(tables["formats"][choice], tables["templates"][choice],
+                        operands["rd"], operands["rs1"], operands["rs2"], operands["imm"])
+    divergence = first_mismatch("pack_words", packed.tolist())
+    if divergence:
+        return divergence
+
+    # The assembler hands encode_instructions immediates as written in source, not raw bit patterns
+    instructions = [(mnemonic, int(operands["rd"][i]), int(operands["rs1"][i]), int(operands["rs2"][i]),
+                     display_imm(inst_type, INSTRUCTIONS[inst_type][mnemonic], int(operands["imm"][i])), i + 1, 1)
+                    for i, (inst_type, mnemonic, _) in enumerate(cases)]
+    try:
+        divergence = first_mismatch("encode_instructions", encode_instructions(instructions))
+    except ValueError:
+        return _failing_case("encode_instructions", cases, instructions, encode_instructions)
+    if divergence:
+        return divergence
+
+    hex_lines = format_hex_lines(np.array(expected, dtype=np.uint32)).decode().split()
+    for i, (want, got) in enumerate(zip(expected_hex, hex_lines)):
+        if want != got:
+            return {"path": "format_hex_lines", "case": cases[i], "expected": want, "actual": got}
+
+    for case, word in zip(cases, expected):
+        try:
+            decoded = decode_word(word)
+        except ValueError as e:
+            decoded = str(e)
+        if decoded != case:
+            return {"path": "decode_word", "case": case, "expected": repr(case), "actual": repr(decoded)}
+
+    words = np.array(expected, dtype=np.uint32)
+    text, _ = format_disassembly(4 * np.arange(len(words), dtype=np.uint64), words)
+    for i, (word, got) in enumerate(zip(expected, text.decode("ascii").splitlines())):
+        want = f"{4 * i:8x}:\t{word:08x}\t{disassemble_word(word)}"
+        if want != got:
+            return {"path": "format_disassembly", "case": cases[i], "expected": want, "actual": got}
+    return None
+
+def shrink_divergence(divergence, cache_dir):
+    """Simplify a diverging case field by field while it still diverges the same way."""
+    inst_type, mnemonic, fields = divergence["case"]
+    fields = list(fields)
+    for i, name in enumerate(FIELD_NAMES[inst_type]):
+        if name not in ("rd", "rs1", "rs2", "imm"):
+            continue
+        value = int(fields[i])
+        # Clear one bit at a time, highest first, keeping each change that still fails
+        for bit in reversed(range(value.bit_length())):
+            if not value >> bit & 1:
+                continue
+            candidate = fields[:i] + [str(value & ~(1 << bit))] + fields[i + 1:]
+            result = check_cases([(inst_type, mnemonic, candidate)], cache_dir)
+            if result and result["path"] == divergence["path"]:
+                value &= ~(1 << bit)
+                fields, divergence = candidate, result
+    return divergence
+
+def _check_job(cases, cache_dir):
+    return len(cases), check_cases(cases, cache_dir)
+
+SIMULATOR_EDGE_VALUES = (0, 1, 2, 31, 32, 0x7FF, 0x800, 0x7FFFFFFF, 0x80000000, 0xFFFFF800, 0xFFFFFFFF)
+
+def _reference_alu(mnemonic, a, b):
+    """Result of an R-type or register-immediate ALU instruction, written out independently of ALU_OPS."""
+    signed_a, signed_b, shift = sign_extend(a, 32), sign_extend(b, 32), b & 0x1F
+    results = {
+        "ADD": a + b, "SUB": a - b, "SLL": a << shift, "SLT": signed_a < signed_b,
+        "SLTU": a < b, "XOR": a ^ b, "SRL": a >> shift, "SRA": signed_a >> shift,
+        "OR": a | b, "AND": a & b,
+    }
+    results.update({
+        "ADDI": a + b, "SLTI": signed_a < signed_b, "SLTIU": a < b, "XORI": a ^ b, "ORI": a | b,
+        "ANDI": a & b, "SLLI": a << shift, "SRLI": a >> shift, "SRAI": signed_a >> shift,
+    })
+    return int(results[mnemonic]) & MASK32
+
+def check_simulator(samples=200, seed=0):
+    """Execute every R-type and register-immediate ALU mnemonic on the simulator.
+
+    Each instruction runs on edge and random operands and its result is compared
+    with _reference_alu. Returns the first divergence or None.
+    """
+    rnd = random.Random(seed)
+    values = list(SIMULATOR_EDGE_VALUES) + [rnd.getrandbits(32) for _ in range(samples)]
+    ecall = int(process_instruction("I", _case("I", "ECALL")[2])[0], 2)
+    mnemonics = [("R", mnemonic) for mnemonic in INSTRUCTIONS["R"]]
+    mnemonics += [("I", mnemonic) for mnemonic in IMMEDIATE_ALU_OPS]
+    for inst_type, mnemonic in mnemonics:
+        for a in values:
+            b = rnd.choice(values)
+            if inst_type == "R":
+                case = _case("R", mnemonic, rd=7, rs1=5, rs2=6)
+            else:
+                funct7 = INSTRUCTIONS["I"][mnemonic].get("funct7")
+                if funct7:
+                    # Shift amounts carry funct7 in the upper immediate bits
+                    b &= 0x1F
+                    imm = int(funct7, 2) << 5 | b
+                else:
+                    imm = b & 0xFFF
+                    b = sign_extend(imm, 12) & MASK32
+                case = _case("I", mnemonic, rd=7, rs1=5, imm=imm)
+            simulator = RV32ISimulator([int(process_instruction(case[0], case[2])[0], 2), ecall], memory_size=64)
+            simulator.regs[5], simulator.regs[6] = a, b
+            try:
+                simulator.run(max_steps=2)
+                actual = simulator.regs[7]
+            except (ValueError, KeyError) as e:
+                actual = f"{type(e).__name__}: {e}"
+            expected = _reference_alu(mnemonic, a, b)
+            if actual != expected:
+                return {"path": "RV32ISimulator", "case": case,
+                        "expected": f"x7 = 0x{expected:08x} for x5 = 0x{a:08x}, operand 0x{b:08x}",
+                        "actual": f"0x{actual:08x}" if isinstance(actual, int) else actual}
+    return None
+
+def run_verification(workers=None, samples=20000, seed=0, generated=100000, chunk_size=VERIFY_CHUNK_SIZE):
+    """Check all encoding paths against the reference encoders in parallel.
+
+    The generator's worker invariance and the simulator's ALU instructions
+    are checked as well. Returns (cases_checked, divergence); divergence is None when every path
+    agreed, otherwise the first diverging case, shrunk to a minimal reproducer.
+    """
+    workers = workers or os.cpu_count() or 1
+    checked = 0
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache_dir = os.path.join(tmp_dir, "cache")
+        cases = verification_cases(samples, seed)
+        chunks = iter(lambda: list(itertools.islice(cases, chunk_size)), [])
+        job = functools.partial(_check_job, cache_dir=cache_dir)
+        with multiprocessing.Pool(workers) as pool:
+            for count, divergence in pool.imap(job, chunks):
+                if divergence:
+                    return checked, shrink_divergence(divergence, cache_dir)
+                checked += count
+
+        # The generator must give the same stream for any worker count, and every word must round-trip
+        worker_counts = (1, max(workers, 2))
+        paths = [os.path.join(tmp_dir, f"generated_{n}.bin") for n in worker_counts]
+        for path, n in zip(paths, worker_counts):
+            generate_instructions(generated, seed, bin_path=path, workers=n, chunk_size=max(1, generated // 4))
+        words = read_image(paths[0])
+        if read_image(paths[1]) != words:
+            return checked, {"path": "generate_instructions (workers)", "case": None,
+                             "expected": "identical output for any worker count", "actual": "different output"}
+        index = verify_roundtrip(words)
+        if index is not None:
+            return checked, {"path": "generate_instructions (round-trip)", "case": None,
+                             "expected": "a decodable word", "actual": f"0x{words[index]:08x} at index {index}"}
+        checked += len(words)
+
+    divergence = check_simulator(seed=seed)
+    if divergence:
+        return checked, divergence
+    return checked, None
+
+# ELF constants used by the section reader
+EM_RISCV = 243
+SHT_SYMTAB = 2
+SHT_NOBITS = 8
+SHT_DYNSYM = 11
+SHF_EXECINSTR = 0x4
+STT_NOTYPE = 0
+STT_FUNC = 2
+EF_RISCV_RVC = 0x1
+
+class ElfFile:
+    """Minimal little-endian ELF32/ELF64 reader built on mmap.
+
+    Only section headers and symbol tables are parsed; section contents are
+    read through memoryview slices of the mapping, so nothing is copied.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "rb")
+        try:
+            self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError) as e:
+            self.file.close()
+            raise ValueError(f"{path}: cannot map file ({e})")
+        try:
+            self._parse_header()
+        except (ValueError, struct.error) as e:
+            self.close()
+            raise ValueError(f"{path}: not a readable RISC-V ELF file ({e})")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.data.close()
+        self.file.close()
+
+    def _parse_header(self):
+        data = self.data
+        if data[:4] != b"\x7fELF":
+            raise ValueError("bad magic")
+        elf_class, byte_order = data[4], data[5]
+        if elf_class not in (1, 2):
+            raise ValueError(f"unknown ELF class {elf_class}")
+        if byte_order != 1:
+            raise ValueError("only little-endian files are supported")
+        self.is64 = elf_class == 2
+        if self.is64:
+            machine, = struct.unpack_from("<H", data, 18)
+            shoff, self.flags = struct.unpack_from("<QI", data, 40)
+            shentsize, shnum, shstrndx = struct.unpack_from("<HHH", data, 58)
+            section_format, self.symbol_format = "<IIQQQQIIQQ", "<IBBHQQ"
+        else:
+            machine, = struct.unpack_from("<H", data, 18)
+            shoff, self.flags = struct.unpack_from("<II", data, 32)
+            shentsize, shnum, shstrndx = struct.unpack_from("<HHH", data, 46)
+            section_format, self.symbol_format = "<IIIIIIIIII", "<IIIBBH"
+        if machine != EM_RISCV:
+            raise ValueError(f"machine type {machine} is not RISC-V")
+
+        self.sections = []
+        for i in range(shnum):
+            fields = struct.unpack_from(section_format, data, shoff + i * shentsize)
+            name, sh_type, flags, addr, offset, size, link, _, _, entsize = fields
+            self.sections.append({"name_offset": name, "type": sh_type, "flags": flags, "addr": addr,
+                                  "offset": offset, "size": size, "link": link, "entsize": entsize})
+        if self.sections and shstrndx < len(self.sections):
+            names = self.sections[shstrndx]
+            for section in self.sections:
+                section["name"] = self._string(names, section["name_offset"])
+        else:
+            for section in self.sections:
+                section["name"] = ""
+
+    def _string(self, strtab, offset):
+        start = strtab["offset"] + offset
+        end = self.data.find(b"\0", start, strtab["offset"] + strtab["size"])
+        return self.data[start:end if end >= 0 else start].decode("utf-8", "replace")
+
+    def executable_sections(self):
+        """Return the sections holding code (SHF_EXECINSTR with file contents)."""
+        return [section for section in self.sections
+                if section["flags"] & SHF_EXECINSTR and section["type"] != SHT_NOBITS]
+
+    def symbols(self):
+        """Map addresses inside executable sections to function and label names."""
+        executable = {index for index, section in enumerate(self.sections)
+                      if section["flags"] & SHF_EXECINSTR}
+        symbol_size = struct.calcsize(self.symbol_format)
+        names = {}
+        for section in self.sections:
+            if section["type"] not in (SHT_SYMTAB, SHT_DYNSYM) or section["link"] >= len(self.sections):
+                continue
+            strtab = self.sections[section["link"]]
+            for offset in range(section["offset"], section["offset"] + section["size"] - symbol_size + 1, symbol_size):
+                if self.is64:
+                    name, info, _, shndx, value, _ = struct.unpack_from(self.symbol_format, self.data, offset)
+                else:
+                    name, value, _, info, _, shndx = struct.unpack_from(self.symbol_format, self.data, offset)
+                if shndx not in executable or info & 0xF not in (STT_NOTYPE, STT_FUNC) or not name:
+                    continue
+                label = self._string(strtab, name)
+                # Skip mapping symbols ($x, $d) and assembler-local labels
+                if label.startswith(("$", ".L")):
+                    continue
+                names.setdefault(value, label)
+        return names
+
+    def word_blocks(self, section, block_words=DISASSEMBLY_BLOCK_WORDS):
+        """Yield (address, words) for a section in blocks, words being a uint32 array copied from the mapping."""
+        count = section["size"] // 4
+        for start in range(0, count, block_words):
+            words = np.frombuffer(self.data, dtype="<u4", count=min(block_words, count - start),
+                                  offset=section["offset"] + 4 * start).astype(np.uint32)
+            yield section["addr"] + 4 * start, words
+
+    def trailing_bytes(self, section):
+        """Return (address, bytes) for the bytes after the last whole word of a section."""
+        size = section["size"] - section["size"] % 4
+        return section["addr"] + size, self.data[section["offset"] + size:section["offset"] + section["size"]]
+
+    def iter_words(self, section):
+        """Yield (address, word) for each 32-bit word of a section, straight from the mapping."""
+        size = section["size"] - section["size"] % 4
+        with memoryview(self.data)[section["offset"]:section["offset"] + size] as view:
+            if sys.byteorder == "little":
+                with view.cast("I") as words:
+                    yield from zip(itertools.count(section["addr"], 4), words)
+            else:
+                for address, (word,) in zip(itertools.count(section["addr"], 4), struct.iter_unpack("<I", view)):
+                    yield address, word
+
+@functools.lru_cache(maxsize=None)
+def disassembly_templates():
+    """Build the tables used to disassemble whole arrays of words at once.
+
+    Returns (templates, table, rules). Each template is (inst_type, shift,
+    pieces), where pieces are literal bytes or operand names. table maps the
+    17 opcode/funct3/funct7 bits of a word to a template index; a negative
+    entry -n selects rules[n - 1], a list of (raw immediate, template) pairs for
+    instructions told apart by their immediate (ECALL/EBREAK). Template 0 is
+    the .word directive used for words that do not decode.
+    """
+    templates = [(None, False, [b".word 0x", "word"])]
+    template_ids = {}
+    for inst_type, group in INSTRUCTIONS.items():
+        for mnemonic, data in group.items():
+            text = f"{mnemonic.lower()} {data['structure']}".rstrip()
+            # Register operands become a literal "x" followed by the register number
+            text = re.sub(r"\b(rd|rs1|rs2)\b", r"x\1", text)
+            pieces = [part if index % 2 else part.encode()
+                      for index, part in enumerate(re.split(f"({OPERAND_PATTERN.pattern})", text)) if part]
+            template_ids[mnemonic] = len(templates)
+            templates.append((inst_type, inst_type == "I" and "funct7" in data, pieces))
+
+    table = np.zeros(1 << 17, dtype=np.int16)
+    rules = []
+    for (opcode, funct3), candidates in DECODE_INDEX.items():
+        # Mirror decode_word: U/UJ entries only apply where no (opcode, funct3) entry exists
+        funct3_values = [funct3] if funct3 is not None else [value for value in range(8) if (opcode, value) not in DECODE_INDEX]
+        for funct7 in range(128):
+            key_rules = []
+            for inst_type, mnemonic, data in candidates:
+                if "funct7" in data and int(data["funct7"], 2) != funct7:
+                    continue
+                imm = int(data["imm"]) if "imm" in data else None
+                if imm is not None and imm >> 5 != funct7:
+                    continue
+                key_rules.append((imm, template_ids[mnemonic]))
+                if imm is None:
+                    break
+            if not key_rules:
+                continue
+            if key_rules[0][0] is None:
+                entry = key_rules[0][1]
+            else:
+                rules.append(key_rules)
+                entry = -len(rules)
+            for value in funct3_values:
+                table[opcode | value << 7 | funct7 << 10] = entry
+    return templates, table, rules
+
+def _template_indices(words):
+    """Return the disassembly template index of every word in a uint32 array."""
+    _, table, rules = disassembly_templates()
+    indices = table[(words & 0x7F) | ((words >> 5) & 0x380) | ((words >> 15) & 0x1FC00)]
+    for code in np.unique(indices[indices < 0]):
+        selected = np.nonzero(indices == code)[0]
+        resolved = np.zeros(len(selected), dtype=np.int16)
+        imms = words[selected] >> 20
+        # Earlier candidates win, as in decode_word
+        for imm, template in reversed(rules[-code - 1]):
+            resolved[imms == imm] = template
+        indices[selected] = resolved
+    return indices
+
+def _decimal_columns(values, width=8):
+    """Render int64 values as left-aligned decimal bytes; returns (chars, lengths).
+
+    Bytes past each row's length are unspecified.
+    """
+    negative = values < 0
+    magnitude = np.abs(values)
+    lengths = negative + 1
+    for power in range(1, width):
+        lengths += magnitude >= 10 ** power
+    powers = 10 ** np.arange(width, dtype=np.int64)
+    chars = np.empty((len(values), width), dtype=np.uint8)
+    for column in range(width):
+        chars[:, column] = 48 + magnitude // powers[np.clip(lengths - 1 - column, 0, width - 1)] % 10
+    chars[negative, 0] = ord("-")
+    return chars, lengths
+
+@functools.lru_cache(maxsize=None)
+def _small_decimals():
+    """Decimal bytes of -4096..4095 (every operand except U/UJ immediates), indexed by value + 4096."""
+    return _decimal_columns(np.arange(-4096, 4096, dtype=np.int64), 5)
+
+# The two hex digits of every byte value, as one uint16 each
+HEX_PAIRS = np.ascontiguousarray(np.stack([np.repeat(HEX_DIGITS, 16), np.tile(HEX_DIGITS, 16)], axis=1)).view(np.uint16).ravel()
+
+def _hex_columns(values, digits):
+    """Render unsigned values as fixed-width, zero-padded lower-case hex bytes (8 or 16 digits)."""
+    values = np.asarray(values).astype(">u8" if digits > 8 else ">u4")
+    return HEX_PAIRS[values.view(np.uint8)].view(np.uint8).reshape(len(values), digits)
+
+def _address_columns(addresses):
+    """Render addresses like f"{address:8x}"; returns (chars, lengths), left-aligned."""
+    digits = 16 if len(addresses) and int(addresses.max()) >> 32 else 8
+    chars = _hex_columns(addresses, digits)
+    columns = np.arange(digits)
+    leading = np.cumprod(chars == ord("0"), axis=1, dtype=bool)
+    leading[:, -1] = False
+    lengths = np.maximum(digits - leading.sum(axis=1), 8)
+    if digits > 8:
+        # Drop the padding beyond eight characters so each row starts at column 0
+        shift = digits - lengths
+        chars = chars[np.arange(len(chars))[:, None], np.minimum(shift[:, None] + columns, digits - 1)]
+        leading = leading[np.arange(len(chars))[:, None], np.minimum(shift[:, None] + columns, digits - 1)]
+    chars[leading] = ord(" ")
+    return chars, lengths
+
+def _operand_columns(name, inst_type, shift, words):
+    """Render one template operand for an array of words; returns (chars, lengths)."""
+    if name == "word":
+        return _hex_columns(words, 8), np.full(len(words), 8)
+    chars, lengths = _small_decimals()
+    if name in ("rd", "rs1", "rs2"):
+        index = ((words >> {"rd": 7, "rs1": 15, "rs2": 20}[name]) & 0x1F) + 4096
+        return chars[index, :2], lengths[index]
+    if name in ("pred", "succ"):
+        index = ((words >> (24 if name == "pred" else 20)) & 0xF) + 4096
+        return chars[index, :2], lengths[index]
+    imm = IMM_DECODERS[inst_type](words).astype(np.int64)
+    if shift:
+        imm &= 0x1F
+    elif inst_type in IMM_BITS:
+        bits = IMM_BITS[inst_type]
+        imm -= (imm >> (bits - 1) & 1) << bits
+    if inst_type in ("U", "UJ"):
+        return _decimal_columns(imm)
+    return chars[imm + 4096], lengths[imm + 4096]
+
+def format_disassembly(addresses, words):
+    """Render "{address:8x}:\\t{word:08x}\\t{text}\\n" lines for arrays of addresses and words.
+
+    The text matches disassemble_word. Lines are built for whole groups of
+    words sharing a template, with no per-word Python work. Returns the bytes
+    and the offset of each line within them.
+    """
+    templates = disassembly_templates()[0]
+    indices = _template_indices(words)
+    address_chars, address_lengths = _address_columns(addresses)
+    lengths = address_lengths + 12
+    groups = []
+    order = np.argsort(indices, kind="stable")
+    counts = np.bincount(indices, minlength=len(templates))
+    for template, rows in zip(np.nonzero(counts)[0], np.split(order, np.cumsum(counts[counts > 0])[:-1])):
+        inst_type, shift, pieces = templates[template]
+        group_words = words[rows]
+        rendered = [piece if isinstance(piece, bytes) else _operand_columns(piece, inst_type, shift, group_words)
+                    for piece in pieces]
+        lengths[rows] += sum(len(piece) if isinstance(piece, bytes) else piece[1] for piece in rendered)
+        groups.append((rows, rendered))
+    ends = np.cumsum(lengths)
+    offsets = ends - lengths
+    # Columns are written whole, so a piece may spill garbage past its end. Pieces
+    # are written left to right and each line's prefix goes in after all the text,
+    # so every spilled byte is overwritten; the padding absorbs the last line's.
+    out = np.empty((int(ends[-1]) if len(ends) else 0) + 16, dtype=np.uint8)
+    text_start = offsets + address_lengths + 11
+    for rows, rendered in groups:
+        position = text_start[rows]
+        for piece in rendered:
+            if isinstance(piece, bytes):
+                chars, width = np.frombuffer(piece, dtype=np.uint8), len(piece)
+            else:
+                chars, width = piece
+            out[position[:, None] + np.arange(len(chars) if chars.ndim == 1 else chars.shape[1])] = chars
+            position = position + width
+    out[offsets[:, None] + np.arange(address_chars.shape[1])] = address_chars
+    cursor = offsets + address_lengths
+    prefix = np.empty((len(words), 11), dtype=np.uint8)
+    prefix[:, 0] = ord(":")
+    prefix[:, 1] = ord("\t")
+    prefix[:, 2:10] = _hex_columns(words, 8)
+    prefix[:, 10] = ord("\t")
+    out[cursor[:, None] + np.arange(11)] = prefix
+    out[ends - 1] = ord("\n")
+    return out[:-16].tobytes(), offsets
+
+def _trailing_lines(address, data):
+    """Format the bytes after a section's last whole word as .half/.byte lines."""
+    lines = []
+    if len(data) >= 2:
+        (half,) = struct.unpack_from("<H", data)
+        lines.append((address, f"{address:8x}:\t{half:04x}\t.half 0x{half:04x}\n"))
+        address, data = address + 2, data[2:]
+    if data:
+        lines.append((address, f"{address:8x}:\t{data[0]:02x}\t.byte 0x{data[0]:02x}\n"))
+    return lines
+
+def _label_line(address, label):
+    return f"\n{address:08x} <{label}>:\n"
+
+def disassemble_elf(path, out, reencode=False):
+    """Write an annotated disassembly of every executable section of an ELF file.
+
+    Sections are rendered a block at a time with format_disassembly. With
+    reencode, every word that decodes is also re-encoded through
+    process_instruction and compared with the original, one word at a time.
+    Bytes after a section's last whole word are shown as .half/.byte lines,
+    and a symbol that is not word aligned is labelled before the word holding
+    it. Files built for the C extension are refused, since their code is not
+    a sequence of 32-bit words. Returns (words, mismatches).
+    """
+    total = 0
+    mismatches = 0
+    with ElfFile(path) as elf:
+        if elf.flags & EF_RISCV_RVC:
+            raise ValueError(f"{path}: built with compressed instructions (EF_RISCV_RVC), which are not supported; "
+                             "rebuild without the C extension, e.g. -march=rv32i")
+        symbols = elf.symbols()
+        symbol_addresses = np.array(sorted(symbols), dtype=np.uint64)
+        for section in elf.executable_sections():
+            out.write(f"\nDisassembly of section {section['name']}:\n")
+            if reencode:
+                count, mismatches_found = _disassemble_reencoding(elf, section, symbols, out)
+                total += count
+                mismatches += mismatches_found
+            else:
+                for start, words in elf.word_blocks(section):
+                    addresses = start + 4 * np.arange(len(words), dtype=np.uint64)
+                    text, offsets = format_disassembly(addresses, words)
+                    # Split the block where symbols start and put their label lines in between
+                    first, last = np.searchsorted(symbol_addresses, [start, start + 4 * len(words)])
+                    position = 0
+                    for address in symbol_addresses[first:last].tolist():
+                        line_start = int(offsets[(address - start) // 4])
+                        out.write(text[position:line_start].decode("ascii"))
+                        out.write(_label_line(address, symbols[address]))
+                        position = line_start
+                    out.write(text[position:].decode("ascii"))
+                    total += len(words)
+            for address, line in _trailing_lines(*elf.trailing_bytes(section)):
+                if address in symbols:
+                    out.write(_label_line(address, symbols[address]))
+                out.write(line)
+    return total, mismatches
+
+def _disassemble_reencoding(elf, section, symbols, out):
+    """Disassemble a section word by word, re-encoding each word; returns (words, mismatches)."""
+    disassemble = build_disassembler()
+    # Remember re-encode results per distinct word, within a bound
+    reencoded = {}
+    total = 0
+    mismatches = 0
+    for address, word in elf.iter_words(section):
+        text = disassemble(word)
+        matches = reencoded.get(word)
+        if matches is None:
+            if len(reencoded) >= DISASSEMBLY_MEMO_SIZE:
+                reencoded.clear()
+            matches = reencoded[word] = text.startswith(".word") or verify_roundtrip([word]) is None
+        if not matches:
+            mismatches += 1
+            text += "  # re-encode mismatch"
+        for label_address in (address, address + 2):
+            label = symbols.get(label_address)
+            if label is not None:
+                out.write(_label_line(label_address, label))
+        out.write(f"{address:8x}:\t{word:08x}\t{text}\n")
+        total += 1
+    return total, mismatches
+
+# Mnemonic lookup across all instruction types, and generator table rows for packing
+MNEMONIC_TYPES = {mnemonic: inst_type for inst_type, group in INSTRUCTIONS.items() for mnemonic in group}
+MNEMONIC_INDEX = {mnemonic: index for index, mnemonic in enumerate(GENERATOR_TABLES["mnemonics"])}
+INVERTED_BRANCHES = {"BEQ": "BNE", "BNE": "BEQ", "BLT": "BGE", "BGE": "BLT", "BLTU": "BGEU", "BGEU": "BLTU"}
+LABEL_PATTERN = re.compile(r"[A-Za-z_.$][\w.$]*\Z")
+
+# Register names accepted in assembly: xN, ABI names and plain decimals as typed in the GUI
+ABI_NAMES = ["zero", "ra", "sp", "gp", "tp", "t0", "t1", "t2", "s0", "s1", "a0", "a1", "a2", "a3", "a4", "a5",
+             "a6", "a7", "s2", "s3", "s4", "s5", "s6", "s7", "s8", "s9", "s10", "s11", "t3", "t4", "t5", "t6"]
+REGISTER_TABLE = {}
+for number, name in enumerate(ABI_NAMES):
+    for alias in (name, f"x{number}", str(number)):
+        REGISTER_TABLE[sys.intern(alias)] = number
+REGISTER_TABLE[sys.intern("fp")] = 8
+
+# Operand structures of the pseudo-instructions, in the same notation as INSTRUCTIONS
+PSEUDO_STRUCTURES = {
+    "NOP": "", "MV": "rd, rs1", "LI": "rd, imm", "LA": "rd, imm", "J": "imm", "CALL": "imm",
+    "RET": "", "JR": "rs1", "BEQZ": "rs1, imm", "BNEZ": "rs1, imm",
+}
+LABEL_OPERANDS = {"LA", "J", "CALL", "BEQZ", "BNEZ"}
+
+STATEMENT_PATTERN = re.compile(
+    r"\s*(?P<labels>(?:[A-Za-z_.$][\w.$]*\s*:\s*)*)"
+    r"(?P<mnemonic>[A-Za-z][\w.]*)?\s*"
+    r"(?P<operands>[^#]*?)\s*(?:#.*)?\Z",
+    re.DOTALL,
+)
+OPERAND_TOKEN = r"[^\s,()]+"
+
+class AssemblySyntaxError(ValueError):
+    """Assembly error pointing at a line and 1-based column."""
+
+    def __init__(self, line, column, message):
+        super().__init__(f"line {line}, column {column}: {message}")
+        self.line = line
+        self.column = column
+
+def parse_immediate(token, allow_label=False):
+    """Parse a decimal, hex (0x), binary (0b) or negative immediate; labels come back as strings."""
+    try:
+        return int(token, 0)
+    except ValueError:
+        pass
+    try:
+        # int(..., 0) rejects leading zeros such as "010"
+        return int(token, 10)
+    except ValueError:
+        if allow_label and LABEL_PATTERN.match(token):
+            return token
+        raise ValueError(f"invalid immediate {token!r}")
+
+STRUCTURE_PARSERS = {}
+
+def compile_structure(structure, allow_label=False):
+    """Compile a structure string such as "rd, imm(rs1)" into an operand parser.
+
+    The parser is built once per structure: a single anchored regex whose
+    groups are converted through the interned register table or as immediates.
+    It is called as parse(text, line, column) with the column where the operand
+    text starts and returns (values, column of the immediate or label operand,
+    or column itself if there is none). It raises AssemblySyntaxError at the
+    offending column.
+    """
+    key = (structure, allow_label)
+    if key in STRUCTURE_PARSERS:
+        return STRUCTURE_PARSERS[key]
+    parts = [part.strip() for part in structure.split(",")] if structure else []
+    part_patterns = []
+    for part in parts:
+        if part == "imm(rs1)":
+            part_patterns.append(rf"(?P<imm>[^\s,()]*)\s*\(\s*(?P<rs1>{OPERAND_TOKEN})\s*\)")
+        else:
+            part_patterns.append(rf"(?P<{part}>{OPERAND_TOKEN})")
+    pattern = re.compile(r"\s*,\s*".join(part_patterns) + r"\Z")
+    single_patterns = [re.compile(part_pattern + r"\Z") for part_pattern in part_patterns]
+    names = list(pattern.groupindex)
+    operands = [(name, name in ("rd", "rs1", "rs2")) for name in names]
+    has_imm = "imm" in names
+    registers = REGISTER_TABLE
+
+    def convert(match, line, column):
+        """Convert matched tokens one by one, reporting the column of a bad one."""
+        values = {}
+        for name, is_register in operands:
+            token = match.group(name)
+            if is_register:
+                number = registers.get(token, registers.get(token.lower()))
+                if number is None:
+                    raise AssemblySyntaxError(line, column + match.start(name), f"unknown register {token!r} for {name}")
+                values[name] = number
+            elif not token:
+                # Empty offset in "(rs1)"
+                values[name] = 0
+            else:
+                try:
+                    values[name] = parse_immediate(token, allow_label)
+                except ValueError as e:
+                    raise AssemblySyntaxError(line, column + match.start(name), str(e))
+        return values
+
+    def parse(text, line, column):
+        match = pattern.match(text)
+        if match is None:
+            _diagnose(parts, single_patterns, text, line, column)
+        imm_column = column + match.start("imm") if has_imm else column
+        # Fast path: lower-case registers and numeric immediates
+        try:
+            values = {}
+            for (name, is_register), token in zip(operands, match.groups()):
+                if is_register:
+                    values[name] = registers[token]
+                else:
+                    values[name] = int(token, 0) if token else 0
+            return values, imm_column
+        except (KeyError, ValueError):
+            return convert(match, line, column), imm_column
+
+    STRUCTURE_PARSERS[key] = parse
+    return parse
+
+def _diagnose(parts, single_patterns, text, line, column):
+    """Raise an AssemblySyntaxError at the first operand that does not fit the structure."""
+    operands = []
+    start = 0
+    for token in text.split(",") if text else []:
+        operands.append((start, token))
+        start += len(token) + 1
+    for index, (start, token) in enumerate(operands):
+        offset = start + len(token) - len(token.lstrip())
+        if index >= len(parts):
+            raise AssemblySyntaxError(line, column + offset, f"unexpected operand {token.strip()!r}")
+        if not single_patterns[index].match(token.strip()):
+            raise AssemblySyntaxError(line, column + offset, f"expected {parts[index]}, got {token.strip()!r}")
+    if len(operands) < len(parts):
+        raise AssemblySyntaxError(line, column + len(text), f"missing operand {parts[len(operands)]}")
+    raise AssemblySyntaxError(line, column, f"expected operands '{', '.join(parts)}'")
+
+def _pc_relative_parts(offset):
+    """Split a PC-relative offset into the AUIPC upper immediate and the low 12-bit part."""
+    low = sign_extend(offset & 0xFFF, 12)
+    return ((offset - low) >> 12) & 0xFFFFF, low
+
+def _load_immediate(rd, value, mnemonic="li"):
+    """Shortest LUI/ADDI sequence that loads a 32-bit constant into rd."""
+    if not -(1 << 31) <= value < (1 << 32):
+        raise ValueError(f"{mnemonic} immediate {value} does not fit in 32 bits")
+    value = sign_extend(value & MASK32, 32)
+    if -2048 <= value <= 2047:
+        return [("ADDI", rd, 0, 0, value)]
+    upper, low = _pc_relative_parts(value & MASK32)
+    sequence = [("LUI", rd, 0, 0, upper)]
+    if low:
+        sequence.append(("ADDI", rd, rd, 0, low))
+    return sequence
+
+def expand_pseudo(mnemonic, values):
+    """Expand one parsed statement into a (kind, data) unit for layout.
+
+    The unit is either ("fixed", [(mnemonic, rd, rs1, rs2, imm), ...]) with
+    every value known, or a label-dependent "branch", "jump" or "la" unit
+    whose size is chosen during branch relaxation.
+    """
+    if mnemonic == "NOP":
+        return "fixed", [("ADDI", 0, 0, 0, 0)]
+    if mnemonic == "MV":
+        return "fixed", [("ADDI", values["rd"], values["rs1"], 0, 0)]
+    if mnemonic == "LI":
+        return "fixed", _load_immediate(values["rd"], values["imm"])
+    if mnemonic == "LA":
+        # A numeric operand is an absolute address, not a PC-relative offset
+        if not isinstance(values["imm"], str):
+            return "fixed", _load_immediate(values["rd"], values["imm"], "la")
+        return "la", (values["rd"], values["imm"])
+    if mnemonic == "J":
+        return "jump", (0, values["imm"])
+    if mnemonic == "CALL":
+        return "jump", (1, values["imm"])
+    if mnemonic == "RET":
+        return "fixed", [("JALR", 0, 1, 0, 0)]
+    if mnemonic == "JR":
+        return "fixed", [("JALR", 0, values["rs1"], 0, 0)]
+    if mnemonic in ("BEQZ", "BNEZ"):
+        branch = "BEQ" if mnemonic == "BEQZ" else "BNE"
+        return "branch", (branch, values["rs1"], 0, values["imm"])
+
+    if mnemonic == "FENCE":
+        values = {"imm": (values["pred"] & 0xF) << 4 | (values["succ"] & 0xF)}
+    target = values.get("imm", 0)
+    inst_type = MNEMONIC_TYPES[mnemonic]
+    if inst_type == "SB":
+        return "branch", (mnemonic, values["rs1"], values["rs2"], target)
+    if inst_type == "UJ" and isinstance(target, str):
+        return "jump", (values["rd"], target)
+    return "fixed", [(mnemonic, values.get("rd", 0), values.get("rs1", 0), values.get("rs2", 0), target)]
+
+def _compile_statement_parsers():
+    """Map every mnemonic (upper case) to its compiled operand parser."""
+    parsers = {}
+    for mnemonic, inst_type in MNEMONIC_TYPES.items():
+        parsers[mnemonic] = compile_structure(INSTRUCTIONS[inst_type][mnemonic]["structure"], inst_type in ("SB", "UJ"))
+    for mnemonic, structure in PSEUDO_STRUCTURES.items():
+        parsers[mnemonic] = compile_structure(structure, mnemonic in LABEL_OPERANDS)
+    # "fence" on its own means "fence iorw, iorw"
+    fence = parsers["FENCE"]
+    parsers["FENCE"] = lambda text, line, column: fence(text or "15, 15", line, column)
+    return parsers
+
+STATEMENT_PARSERS = _compile_statement_parsers()
+
+def split_statements(text):
+    """Split a source line into (statement, column offset) pairs at ";" separators, dropping any # comment."""
+    code = text.split("#", 1)[0]
+    if ";" not in code:
+        return [(code, 0)]
+    statements = []
+    offset = 0
+    for statement in code.split(";"):
+        statements.append((statement, offset))
+        offset += len(statement) + 1
+    return statements
+
+def tokenize_line(text, line, offset=0):
+    """Parse one statement into (labels, mnemonic, operand values, column).
+
+    column is that of the immediate or label operand, or of the operands when
+    there is none. mnemonic is None for blank, comment-only and label-only
+    statements. offset is added to every column, for statements that follow a
+    ";" on their line.
+    """
+    if ":" in text or "#" in text:
+        match = STATEMENT_PATTERN.match(text)
+        labels, name, operands = match.groups()
+        labels = [label.strip() for label in labels.split(":")[:-1]] if labels else []
+        column = offset + match.start("operands") + 1
+        if name is None:
+            if operands:
+                raise AssemblySyntaxError(line, column, f"expected an instruction, got {operands!r}")
+            return labels, None, None, column
+        name_column = offset + match.start("mnemonic") + 1
+    else:
+        # Plain "mnemonic operands" line: no regex needed
+        labels = []
+        parts = text.split(None, 1)
+        if not parts:
+            return labels, None, None, offset + 1
+        name = parts[0]
+        operands = parts[1].rstrip() if len(parts) > 1 else ""
+        name_column = offset + len(text) - len(text.lstrip()) + 1
+        column = offset + len(text.rstrip()) - len(operands) + 1
+    mnemonic = name.upper()
+    parser = STATEMENT_PARSERS.get(mnemonic)
+    if parser is None:
+        raise AssemblySyntaxError(line, name_column, f"unknown instruction {name!r}")
+    values, column = parser(operands, line, column)
+    return labels, mnemonic, values, column
+
+def _branch_size(offset):
+    """Bytes needed for a branch: 4, 8 via an inverted branch over a JAL, or None if out of JAL range."""
+    if -4096 <= offset <= 4094:
+        return 4
+    if -(1 << 20) <= offset - 4 < (1 << 20):
+        return 8
+    return None
+
+def _jump_size(offset, rd):
+    """Bytes needed for a jump: 4, 8 via AUIPC+JALR through the link register, or None if impossible."""
+    if -(1 << 20) <= offset < (1 << 20):
+        return 4
+    # Without a link register there is no register to clobber for AUIPC
+    return 8 if rd else None
+
+def relax(units, labels, base=0):
+    """Choose sizes for label-dependent units, growing them until every target is in range.
+
+    units are (kind, data, line, column) tuples, column being that of the
+    immediate or label operand, and labels maps names to unit indexes.
+    Sizes only ever grow, so the loop reaches a fixed point; each pass is
+    linear in the number of units and real programs settle in a few passes.
+    A branch or a jump without a link register whose target is beyond the
+    +-1 MiB JAL range is an error. Returns (sizes, addresses, label_addresses).
+    """
+    sizes = [4 * len(data) if kind == "fixed" else (8 if kind == "la" else 4) for kind, data, _, _ in units]
+    for kind, data, line, column in units:
+        if kind != "fixed" and isinstance(data[-1], str) and data[-1] not in labels:
+            raise AssemblySyntaxError(line, column, f"undefined label {data[-1]!r}")
+    relaxable = [i for i, (kind, data, _, _) in enumerate(units) if kind in ("branch", "jump") and isinstance(data[-1], str)]
+    while True:
+        addresses = list(itertools.accumulate(sizes, initial=base))
+        label_addresses = {name: addresses[index] for name, index in labels.items()}
+        changed = False
+        for i in relaxable:
+            kind, data, line, column = units[i]
+            offset = label_addresses[data[-1]] - addresses[i]
+            size = _branch_size(offset) if kind == "branch" else _jump_size(offset, data[0])
+            if size is None:
+                # Offsets only grow during relaxation, so this target stays out of reach
+                raise AssemblySyntaxError(line, column, f"target {data[-1]!r} is {offset} bytes away, out of range for {'a branch' if kind == 'branch' else 'a jump without a link register'} (+-1 MiB)")
+            if size > sizes[i]:
+                sizes[i] = size
+                changed = True
+        if not changed:
+            return sizes, addresses, label_addresses
+
+def _resolve(target, label_addresses, address):
+    return label_addresses[target] - address if isinstance(target, str) else target
+
+def emit(units, sizes, addresses, label_addresses):
+    """Lower laid-out units to (mnemonic, rd, rs1, rs2, imm, line, column) instructions."""
+    instructions = []
+    for (kind, data, line, column), size, address in zip(units, sizes, addresses):
+        if kind == "fixed":
+            instructions.extend(item + (line, column) for item in data)
+        elif kind == "la":
+            rd, target = data
+            upper, low = _pc_relative_parts(_resolve(target, label_addresses, address))
+            instructions += [("AUIPC", rd, 0, 0, upper, line, column), ("ADDI", rd, rd, 0, low, line, column)]
+        elif kind == "jump":
+            rd, target = data
+            offset = _resolve(target, label_addresses, address)
+            if size == 4:
+                instructions.append(("JAL", rd, 0, 0, offset, line, column))
+            else:
+                upper, low = _pc_relative_parts(offset)
+                instructions += [("AUIPC", rd, 0, 0, upper, line, column), ("JALR", rd, rd, 0, low, line, column)]
+        else:
+            mnemonic, rs1, rs2, target = data
+            offset = _resolve(target, label_addresses, address)
+            if size == 4:
+                instructions.append((mnemonic, 0, rs1, rs2, offset, line, column))
+                continue
+            # Out of range: skip over a jump with the inverted condition
+            instructions.append((INVERTED_BRANCHES[mnemonic], 0, rs1, rs2, size, line, column))
+            instructions.append(("JAL", 0, 0, 0, offset - 4, line, column))
+    return instructions
+
+def _raw_immediate(mnemonic, value, line, column):
+    """Range-check an immediate and return the raw unsigned value the encoders take."""
+    inst_type = MNEMONIC_TYPES[mnemonic]
+    data = INSTRUCTIONS[inst_type][mnemonic]
+    if "imm" in data:
+        return int(data["imm"])
+    if inst_type == "I" and "funct7" in data:
+        if not 0 <= value <= 31:
+            raise AssemblySyntaxError(line, column, f"shift amount {value} out of range 0..31")
+        return int(data["funct7"], 2) << 5 | value
+    if inst_type == "R":
+        return 0
+    bits = IMM_WIDTHS[inst_type]
+    if mnemonic == "FENCE":
+        bits = 8
+    low, high = -(1 << (bits - 1)), (1 << (bits - 1)) - 1
+    if inst_type == "U" or mnemonic == "FENCE":
+        # Upper immediates and fence masks may also be written unsigned
+        high = (1 << bits) - 1
+    if not low <= value <= high:
+        raise AssemblySyntaxError(line, column, f"{mnemonic.lower()} immediate {value} out of range {low}..{high}")
+    if inst_type in ("SB", "UJ") and value & 1:
+        raise AssemblySyntaxError(line, column, f"{mnemonic.lower()} offset {value} must be even")
+    return value & ((1 << bits) - 1)
+
+def encode_instructions(instructions):
+    """Encode (mnemonic, rd, rs1, rs2, imm, line, column) tuples with the vectorized encoder."""
+    tables = GENERATOR_TABLES
+    choice, rd, rs1, rs2, imm = [], [], [], [], []
+    for mnemonic, d, s1, s2, value, line, column in instructions:
+        choice.append(MNEMONIC_INDEX[mnemonic])
+        rd.append(d)
+        rs1.append(s1)
+        rs2.append(s2)
+        imm.append(_raw_immediate(mnemonic, value, line, column))
+    choice = np.array(choice, dtype=np.intp)
+    words = pack_words(tables["formats"][choice], tables["templates"][choice],
+                       *(np.array(values, dtype=np.uint32) for values in (rd, rs1, rs2, imm)))
+    return array("I", words.tobytes())
+
+def assemble(lines, base=0):
+    """Assemble source lines into 32-bit words.
+
+    Pseudo-instructions (li, la, mv, nop, j, call, ret, jr, beqz, bnez) are
+    expanded to the shortest base sequence and out-of-range branches and
+    jumps are relaxed. Returns (words, label_addresses).
+    """
+    units = []
+    labels = {}
+    for line_number, line in enumerate(lines, 1):
+        for statement, offset in split_statements(line):
+            names, mnemonic, values, column = tokenize_line(statement, line_number, offset)
+            for name in names:
+                if name in labels:
+                    raise AssemblySyntaxError(line_number, offset + statement.index(name) + 1, f"duplicate label {name!r}")
+                labels[name] = len(units)
+            if mnemonic:
+                try:
+                    units.append(expand_pseudo(mnemonic, values) + (line_number, column))
+                except ValueError as e:
+                    raise AssemblySyntaxError(line_number, column, str(e))
+    sizes, addresses, label_addresses = relax(units, labels, base)
+    instructions = emit(units, sizes, addresses, label_addresses)
+    if not instructions:
+        return array("I"), label_addresses
+    return encode_instructions(instructions), label_addresses
+
+# Watch mode defaults
+WATCH_SUFFIXES = (".s", ".S", ".asm")
+WATCH_POLL_INTERVAL = 0.05
+WATCH_SCAN_INTERVAL = 1.0
+WATCH_DEBOUNCE = 0.03
+WATCH_HOT_FILES = 64
+
+class SourceWatcher:
+    """Re-assemble changed assembly sources under a directory tree by stat polling.
+
+    Every poll interval only the recently edited ("hot") files and the
+    directories are stat'ed; directory mtimes catch new, deleted and renamed
+    files. The whole tree is rescanned every scan interval to catch in-place
+    edits of other files, so the first save of a file that is not hot is
+    only noticed at the next rescan (up to scan_interval later). Changes are debounced so a burst of saves is built
+    once, and a file is only re-encoded when its contents actually changed.
+    """
+
+    def __init__(self, root, output_dir=None, suffixes=WATCH_SUFFIXES, poll_interval=WATCH_POLL_INTERVAL,
+                 scan_interval=WATCH_SCAN_INTERVAL, debounce=WATCH_DEBOUNCE, hot_files=WATCH_HOT_FILES, log=print):
+        self.root = root
+        self.output_dir = output_dir
+        self.suffixes = tuple(suffixes)
+        self.poll_interval = poll_interval
+        self.scan_interval = scan_interval
+        self.debounce = debounce
+        self.log = log
+        self.files = {}
+        self.dirs = {}
+        self.hot = collections.OrderedDict()
+        self.hot_files = hot_files
+        self.digests = {}
+        self.pending = set()
+        self.failed = set()
+        self.last_change = 0.0
+        self.next_scan = 0.0
+
+    def _scan(self):
+        """Stat every source file and directory; return the paths whose stat changed."""
+        files = {}
+        dirs = {}
+        stack = [self.root]
+        while stack:
+            directory = stack.pop()
+            try:
+                dirs[directory] = os.stat(directory).st_mtime_ns
+                with os.scandir(directory) as it:
+                    for entry in it:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.name.endswith(self.suffixes):
+                            stat = entry.stat()
+                            files[entry.path] = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                continue
+        changed = {path for path, state in files.items() if self.files.get(path) != state}
+        self.files = files
+        self.dirs = dirs
+        return changed
+
+    def _poll_hot(self):
+        """Stat hot files and directories; return changed files, or None if a directory changed."""
+        for directory, mtime in self.dirs.items():
+            try:
+                if os.stat(directory).st_mtime_ns != mtime:
+                    return None
+            except OSError:
+                return None
+        changed = set()
+        for path in self.hot:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            state = (stat.st_mtime_ns, stat.st_size)
+            if self.files.get(path) != state:
+                self.files[path] = state
+                changed.add(path)
+        return changed
+
+    def output_paths(self, source):
+        """Return the (hex, bin) output paths for a source file."""
+        base = os.path.splitext(source)[0]
+        if self.output_dir:
+            base = os.path.join(self.output_dir, os.path.relpath(base, self.root))
+        return base + ".hex", base + ".bin"
+
+    def build(self, source):
+        """Assemble one source file into its outputs; return True if it was re-encoded."""
+        try:
+            with open(source, "rb") as f:
+                content = f.read()
+        except OSError:
+            return False
+        digest = hashlib.blake2b(content, digest_size=16).digest()
+        if self.digests.get(source) == digest:
+            return False
+        start = time.perf_counter()
+        try:
+            words, _ = assemble(content.decode("utf-8", "replace").splitlines())
+        except ValueError as e:
+            self.log(f"{source}: {e}")
+            self.digests.pop(source, None)
+            return False
+        hex_path, bin_path = self.output_paths(source)
+        try:
+            os.makedirs(os.path.dirname(hex_path) or ".", exist_ok=True)
+            write_outputs(words, hex_path, bin_path)
+        except OSError as e:
+            # Retried on the next full scan
+            self.log(f"{source}: cannot write output ({e})")
+            self.digests.pop(source, None)
+            self.failed.add(source)
+            return False
+        self.failed.discard(source)
+        self.digests[source] = digest
+        self.log(f"{source}: {len(words)} instructions ({(time.perf_counter() - start) * 1000:.0f} ms)")
+        return True
+
+    def start(self):
+        """Take the initial snapshot and build sources whose outputs are missing or stale."""
+        self._scan()
+        self.next_scan = time.monotonic() + self.scan_interval
+        for source, (mtime, _) in self.files.items():
+            bin_path = self.output_paths(source)[1]
+            try:
+                fresh = os.stat(bin_path).st_mtime_ns >= mtime
+            except OSError:
+                fresh = False
+            if not fresh:
+                self.build(source)
+
+    def step(self, now=None):
+        """Run one polling cycle; return the sources re-encoded in it."""
+        now = time.monotonic() if now is None else now
+        changed = self._poll_hot()
+        if changed is None or now >= self.next_scan:
+            changed = (changed or set()) | self._scan() | self.failed
+            self.failed = set()
+            self.next_scan = now + self.scan_interval
+        if changed:
+            self.pending |= changed
+            self.last_change = now
+            for path in changed:
+                self.hot[path] = None
+                self.hot.move_to_end(path)
+            while len(self.hot) > self.hot_files:
+                self.hot.popitem(last=False)
+        if not self.pending or now - self.last_change < self.debounce:
+            return []
+        built = [source for source in sorted(self.pending) if source in self.files and self.build(source)]
+        self.pending.clear()
+        return built
+
+    def run(self):
+        """Poll until interrupted."""
+        self.start()
+        while True:
+            self.step()
+            time.sleep(self.debounce if self.pending else self.poll_interval)
+
+DIFF_BLOCK_WORDS = 4096
+HEX_LINE = re.compile(rb"0x[0-9a-f]{8}\n")
+TEXT_SUFFIXES = (".hex", ".csv", ".txt")
+TEXT_BYTES = bytes(range(32, 127)) + b"\t\r\n"
+IS_HEX_DIGIT = np.zeros(256, dtype=bool)
+IS_HEX_DIGIT[np.frombuffer(b"0123456789abcdef", dtype=np.uint8)] = True
+
+def parse_word_text(token):
+    """Parse a word written as hex (with or without 0x) or as a 32-bit binary string."""
+    token = token.strip()
+    if len(token) == 32 and not token.strip("01"):
+        return int(token, 2)
+    return int(token, 16)
+
+def _is_fixed_hex(data, block_words=DIFF_BLOCK_WORDS):
+    """True if data consists only of complete "0x%08x\\n" records, as written by write_outputs."""
+    if len(data) % 11:
+        return False
+    records = np.frombuffer(data, dtype=np.uint8).reshape(-1, 11)
+    for start in range(0, len(records), block_words):
+        block = records[start:start + block_words]
+        if not ((block[:, 0] == ord("0")).all() and (block[:, 1] == ord("x")).all()
+                and (block[:, 10] == ord("\n")).all() and IS_HEX_DIGIT[block[:, 2:10]].all()):
+            return False
+    return True
+
+def iter_word_blocks(path, block_words=DIFF_BLOCK_WORDS):
+    """Yield (kind, raw, load) for consecutive blocks of block_words words of an encoded file.
+
+    Binary images and the hex listings written by write_outputs are memory
+    mapped and raw is a view of the block's bytes, so unchanged blocks can be
+    hashed without parsing them (a hex file is only mapped if every line is a
+    complete "0x%08x" record); load() parses a block into an array of words
+    only when it is needed. Other text (including the results.csv written by
+    save_results, via its Hex column) is streamed and parsed line by line.
+    Blocks of the same kind can be compared by hashing raw.
+    """
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        head = f.read(64)
+        suffix = os.path.splitext(path)[1].lower()
+        is_text = suffix in TEXT_SUFFIXES or suffix != ".bin" and bool(head) and not head.translate(None, TEXT_BYTES)
+        fixed_hex = is_text and size % 11 == 0 and HEX_LINE.match(head)
+        if not is_text and size % 4:
+            raise ValueError(f"{path}: image size {size} is not a multiple of 4 bytes")
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size and (fixed_hex or not is_text) else None
+        if fixed_hex and not _is_fixed_hex(data, block_words):
+            # Starts like a hex listing but is not one throughout: parse it as text
+            data.close()
+            data = None
+        if data is not None:
+            record = 11 if fixed_hex else 4
+            try:
+                with memoryview(data) as view:
+                    for start in range(0, size, block_words * record):
+                        with view[start:start + block_words * record] as raw:
+                            if fixed_hex:
+                                yield "hex", raw, lambda raw=raw: array("I", (int(line, 16) for line in bytes(raw).split()))
+                            else:
+                                yield "words", raw, lambda raw=raw: _words_from_bytes(raw)
+            finally:
+                data.close()
+            return
+    if not size:
+        return
+    with open(path, newline="") as f:
+        rows = csv.reader(f)
+        first = next(rows, None)
+        column = first.index("Hex") if first and "Hex" in first else None
+        if column is None:
+            rows = itertools.chain([first], rows)
+        block = array("I")
+        for line_number, row in enumerate(rows, 2 if column is not None else 1):
+            if not row or not "".join(row).strip():
+                continue
+            try:
+                block.append(parse_word_text(row[column if column is not None else 0]))
+            except (ValueError, IndexError):
+                raise ValueError(f"{path}: line {line_number}: not an encoded instruction: {','.join(row)!r}")
+            if len(block) == block_words:
+                yield "words", _word_bytes(block), lambda block=block: block
+                block = array("I")
+        if block:
+            yield "words", _word_bytes(block), lambda block=block: block
+
+def _words_from_bytes(raw):
+    words = array("I")
+    words.frombytes(raw)
+    if sys.byteorder != "little":
+        words.byteswap()
+    return words
+
+def _word_bytes(words):
+    if sys.byteorder != "little":
+        words = array("I", words)
+        words.byteswap()
+    return memoryview(words).cast("B")
+
+def _block_digest(kind, raw, load, canonical):
+    if canonical and kind != "words":
+        raw = _word_bytes(load())
+    return hashlib.blake2b(raw, digest_size=16).digest()
+
+def diff_encoded(path_a, path_b, block_words=DIFF_BLOCK_WORDS, max_diffs=100, base=0):
+    """Compare two encoded programs block by block.
+
+    Each block is hashed and only blocks whose hashes differ are decoded and
+    compared word by word. Returns (differences, total_differences,
+    differing_blocks, blocks) where differences lists up to max_diffs
+    (address, before, after) tuples; before/after is None past the end of
+    the shorter input.
+    """
+    differences = []
+    total = 0
+    differing_blocks = 0
+    blocks = 0
+    blocks_a = iter_word_blocks(path_a, block_words)
+    blocks_b = iter_word_blocks(path_b, block_words)
+    for index, (block_a, block_b) in enumerate(itertools.zip_longest(blocks_a, blocks_b)):
+        blocks += 1
+        if block_a and block_b:
+            # Blocks of the same kind are hashed as stored; otherwise as words
+            canonical = block_a[0] != block_b[0]
+            if _block_digest(*block_a, canonical) == _block_digest(*block_b, canonical):
+                continue
+        differing_blocks += 1
+        words_a = block_a[2]() if block_a else array("I")
+        words_b = block_b[2]() if block_b else array("I")
+        start = base + index * block_words * 4
+        for offset, (before, after) in enumerate(itertools.zip_longest(words_a, words_b)):
+            if before != after:
+                total += 1
+                if len(differences) < max_diffs:
+                    differences.append((start + offset * 4, before, after))
+    return differences, total, differing_blocks, blocks
+
 class RISCVConverterGUI:
     def __init__(self, root):
         self.root = root
@@ -270,267 +2759,8 @@ class RISCVConverterGUI:
         # Save format variable
         self.save_format_var = ctk.StringVar(value="csv")
         
-        # Instructions dictionary (RV32I base instruction set) with added structure and descriptions
-        self.instructions = {
-            "R": {
-                "ADD": {
-                    "funct7": "0000000", "funct3": "000", "opcode": "0110011",
-                    "structure": "rd, rs1, rs2",
-                    "description_en": "ADD: Adds the values in rs1 and rs2, stores the result in rd.",
-                    "description_zh": "ADD:将 rs1 和 rs2 中的值相加,结果存入 rd。"
-                },
-                "SUB": {
-                    "funct7": "0100000", "funct3": "000", "opcode": "0110011",
-                    "structure": "rd, rs1, rs2",
-                    "description_en": "SUB: Subtracts rs2 from rs1, stores the result in rd.",
-                    "description_zh": "SUB:从 rs1 中减去 rs2,结果存入 rd。"
-                },
-                "SLL": {
-                    "funct7": "0000000", "funct3": "001", "opcode": "0110011",
-                    "structure": "rd, rs1, rs2",
-                    "description_en": "SLL: Logical left shift on rs1 by rs2 bits, stores in rd.",
-                    "description_zh": "SLL:将 rs1 逻辑左移 rs2 位,结果存入 rd。"
-                },
-                "SLT": {
-                    "funct7": "0000000", "funct3": "010", "opcode": "0110011",
-                    "structure": "rd, rs1, rs2",
-                    "description_en": "SLT: Sets rd to 1 if rs1 < rs2 (signed), else 0.",
-                    "description_zh": "SLT:如果 rs1 < rs2(有符号),将 rd 设为 1,否则为 0。"
-                },
-                "SLTU": {
-                    "funct7": "0000000", "funct3": "011", "opcode": "0110011",
-                    "structure": "rd, rs1, rs2",
-                    "description_en": "SLTU: Sets rd to 1 if rs1 < rs2 (unsigned), else 0.",
-                    "description_zh": "SLTU:如果 rs1 < rs2(无符号),将 rd 设为 1,否则为 0。"
-                },
-                "XOR": {
-                    "funct7": "0000000", "funct3": "100", "opcode": "0110011",
-                    "structure": "rd, rs1, rs2",
-                    "description_en": "XOR: Bitwise XOR of rs1 and rs2, stores in rd.",
-                    "description_zh": "XOR:rs1 和 rs2 的按位异或,结果存入 rd。"
-                },
-                "SRL": {
-                    "funct7": "0000000", "funct3": "101", "opcode": "0110011",
-                    "structure": "rd, rs1, rs2",
-                    "description_en": "SRL: Logical right shift on rs1 by rs2 bits, stores in rd.",
-                    "description_zh": "SRL:将 rs1 逻辑右移 rs2 位,结果存入 rd。"
-                },
-                "SRA": {
-                    "funct7": "0100000", "funct3": "101", "opcode": "0110011",
-                    "structure": "rd, rs1, rs2",
-                    "description_en": "SRA: Arithmetic right shift on rs1 by rs2 bits, stores in rd.",
-                    "description_zh": "SRA:将 rs1 算术右移 rs2 位,结果存入 rd。"
-                },
-                "OR": {
-                    "funct7": "0000000", "funct3": "110", "opcode": "0110011",
-                    "structure": "rd, rs1, rs2",
-                    "description_en": "OR: Bitwise OR of rs1 and rs2, stores in rd.",
-                    "description_zh": "OR:rs1 和 rs2 的按位或,结果存入 rd。"
-                },
-                "AND": {
-                    "funct7": "0000000", "funct3": "111", "opcode": "0110011",
-                    "structure": "rd, rs1, rs2",
-                    "description_en": "AND: Bitwise AND of rs1 and rs2, stores in rd.",
-                    "description_zh": "AND:rs1 和 rs2 的按位与,结果存入 rd。"
-                },
-            },
-            "I": {
-                "ADDI": {
-                    "funct3": "000", "opcode": "0010011",
-                    "structure": "rd, rs1, imm",
-                    "description_en": "ADDI: Adds immediate to rs1, stores in rd.",
-                    "description_zh": "ADDI:将立即数加到 rs1,结果存入 rd。"
-                },
-                "SLTI": {
-                    "funct3": "010", "opcode": "0010011",
-                    "structure": "rd, rs1, imm",
-                    "description_en": "SLTI: Sets rd to 1 if rs1 < imm (signed), else 0.",
-                    "description_zh": "SLTI:如果 rs1 < imm(有符号),将 rd 设为 1,否则为 0。"
-                },
-                "SLTIU": {
-                    "funct3": "011", "opcode": "0010011",
-                    "structure": "rd, rs1, imm",
-                    "description_en": "SLTIU: Sets rd to 1 if rs1 < imm (unsigned), else 0.",
-                    "description_zh": "SLTIU:如果 rs1 < imm(无符号),将 rd 设为 1,否则为 0。"
-                },
-                "XORI": {
-                    "funct3": "100", "opcode": "0010011",
-                    "structure": "rd, rs1, imm",
-                    "description_en": "XORI: Bitwise XOR of rs1 and imm, stores in rd.",
-                    "description_zh": "XORI:rs1 和 imm 的按位异或,结果存入 rd。"
-                },
-                "ORI": {
-                    "funct3": "110", "opcode": "0010011",
-                    "structure": "rd, rs1, imm",
-                    "description_en": "ORI: Bitwise OR of rs1 and imm, stores in rd.",
-                    "description_zh": "ORI:rs1 和 imm 的按位或,结果存入 rd。"
-                },
-                "ANDI": {
-                    "funct3": "111", "opcode": "0010011",
-                    "structure": "rd, rs1, imm",
-                    "description_en": "ANDI: Bitwise AND of rs1 and imm, stores in rd.",
-                    "description_zh": "ANDI:rs1 和 imm 的按位与,结果存入 rd。"
-                },
-                "SLLI": {
-                    "funct7": "0000000", "funct3": "001", "opcode": "0010011",
-                    "structure": "rd, rs1, imm",
-                    "description_en": "SLLI: Logical left shift on rs1 by imm bits, stores in rd.",
-                    "description_zh": "SLLI:将 rs1 逻辑左移 imm 位,结果存入 rd。"
-                },
-                "SRLI": {
-                    "funct7": "0000000", "funct3": "101", "opcode": "0010011",
-                    "structure": "rd, rs1, imm",
-                    "description_en": "SRLI: Logical right shift on rs1 by imm bits, stores in rd.",
-                    "description_zh": "SRLI:将 rs1 逻辑右移 imm 位,结果存入 rd。"
-                },
-                "SRAI": {
-                    "funct7": "0100000", "funct3": "101", "opcode": "0010011",
-                    "structure": "rd, rs1, imm",
-                    "description_en": "SRAI: Arithmetic right shift on rs1 by imm bits, stores in rd.",
-                    "description_zh": "SRAI:将 rs1 算术右移 imm 位,结果存入 rd。"
-                },
-                "LB": {
-                    "funct3": "000", "opcode": "0000011",
-                    "structure": "rd, imm(rs1)",
-                    "description_en": "LB: Loads a signed byte from memory at rs1 + imm into rd.",
-                    "description_zh": "LB:从 rs1 + imm 处的内存加载有符号字节到 rd。"
-                },
-                "LH": {
-                    "funct3": "001", "opcode": "0000011",
-                    "structure": "rd, imm(rs1)",
-                    "description_en": "LH: Loads a signed halfword from memory at rs1 + imm into rd.",
-                    "description_zh": "LH:从 rs1 + imm 处的内存加载有符号半字到 rd。"
-                },
-                "LW": {
-                    "funct3": "010", "opcode": "0000011",
-                    "structure": "rd, imm(rs1)",
-                    "description_en": "LW: Loads a word from memory at rs1 + imm into rd.",
-                    "description_zh": "LW:从 rs1 + imm 处的内存加载字到 rd。"
-                },
-                "LBU": {
-                    "funct3": "100", "opcode": "0000011",
-                    "structure": "rd, imm(rs1)",
-                    "description_en": "LBU: Loads an unsigned byte from memory at rs1 + imm into rd.",
-                    "description_zh": "LBU:从 rs1 + imm 处的内存加载无符号字节到 rd。"
-                },
-                "LHU": {
-                    "funct3": "101", "opcode": "0000011",
-                    "structure": "rd, imm(rs1)",
-                    "description_en": "LHU: Loads an unsigned halfword from memory at rs1 + imm into rd.",
-                    "description_zh": "LHU:从 rs1 + imm 处的内存加载无符号半字到 rd。"
-                },
-                "FENCE": {
-                    "funct3": "000", "opcode": "0001111",
-                    "structure": "pred, succ",
-                    "description_en": "FENCE: Orders memory accesses.",
-                    "description_zh": "FENCE:对内存访问进行排序。"
-                },
-                "FENCE.I": {
-                    "funct3": "001", "opcode": "0001111",
-                    "structure": "",
-                    "description_en": "FENCE.I: Synchronizes instruction and data streams.",
-                    "description_zh": "FENCE.I:同步指令和数据流。"
-                },
-                "JALR": {
-                    "funct3": "000", "opcode": "1100111",
-                    "structure": "rd, imm(rs1)",
-                    "description_en": "JALR: Jumps to rs1 + imm and stores return address in rd.",
-                    "description_zh": "JALR:跳转到 rs1 + imm,并将返回地址存入 rd。"
-                },
-                "ECALL": {
-                    "funct3": "000", "opcode": "1110011", "imm": "0",
-                    "structure": "",
-                    "description_en": "ECALL: Makes an environment call.",
-                    "description_zh": "ECALL:进行环境调用。"
-                },
-                "EBREAK": {
-                    "funct3": "000", "opcode": "1110011", "imm": "1",
-                    "structure": "",
-                    "description_en": "EBREAK: Causes a breakpoint exception.",
-                    "description_zh": "EBREAK:引起断点异常。"
-                },
-            },
-            "S": {
-                "SB": {
-                    "funct3": "000", "opcode": "0100011",
-                    "structure": "rs2, imm(rs1)",
-                    "description_en": "SB: Stores a byte from rs2 to memory at rs1 + imm.",
-                    "description_zh": "SB:将 rs2 中的字节存入 rs1 + imm 处的内存。"
-                },
-                "SH": {
-                    "funct3": "001", "opcode": "0100011",
-                    "structure": "rs2, imm(rs1)",
-                    "description_en": "SH: Stores a halfword from rs2 to memory at rs1 + imm.",
-                    "description_zh": "SH:将 rs2 中的半字存入 rs1 + imm 处的内存。"
-                },
-                "SW": {
-                    "funct3": "010", "opcode": "0100011",
-                    "structure": "rs2, imm(rs1)",
-                    "description_en": "SW: Stores a word from rs2 to memory at rs1 + imm.",
-                    "description_zh": "SW:将 rs2 中的字存入 rs1 + imm 处的内存。"
-                },
-            },
-            "SB": {
-                "BEQ": {
-                    "funct3": "000", "opcode": "1100011",
-                    "structure": "rs1, rs2, imm",
-                    "description_en": "BEQ: Branches if rs1 == rs2 to PC + imm.",
-                    "description_zh": "BEQ:如果 rs1 == rs2,则分支到 PC + imm。"
-                },
-                "BNE": {
-                    "funct3": "001", "opcode": "1100011",
-                    "structure": "rs1, rs2, imm",
-                    "description_en": "BNE: Branches if rs1 != rs2 to PC + imm.",
-                    "description_zh": "BNE:如果 rs1 != rs2,则分支到 PC + imm。"
-                },
-                "BLT": {
-                    "funct3": "100", "opcode": "1100011",
-                    "structure": "rs1, rs2, imm",
-                    "description_en": "BLT: Branches if rs1 < rs2 (signed) to PC + imm.",
-                    "description_zh": "BLT:如果 rs1 < rs2(有符号),则分支到 PC + imm。"
-                },
-                "BGE": {
-                    "funct3": "101", "opcode": "1100011",
-                    "structure": "rs1, rs2, imm",
-                    "description_en": "BGE: Branches if rs1 >= rs2 (signed) to PC + imm.",
-                    "description_zh": "BGE:如果 rs1 >= rs2(有符号),则分支到 PC + imm。"
-                },
-                "BLTU": {
-                    "funct3": "110", "opcode": "1100011",
-                    "structure": "rs1, rs2, imm",
-                    "description_en": "BLTU: Branches if rs1 < rs2 (unsigned) to PC + imm.",
-                    "description_zh": "BLTU:如果 rs1 < rs2(无符号),则分支到 PC + imm。"
-                },
-                "BGEU": {
-                    "funct3": "111", "opcode": "1100011",
-                    "structure": "rs1, rs2, imm",
-                    "description_en": "BGEU: Branches if rs1 >= rs2 (unsigned) to PC + imm.",
-                    "description_zh": "BGEU:如果 rs1 >= rs2(无符号),则分支到 PC + imm。"
-                },
-            },
-            "U": {
-                "LUI": {
-                    "opcode": "0110111",
-                    "structure": "rd, imm",
-                    "description_en": "LUI: Loads upper immediate into rd (upper 20 bits).",
-                    "description_zh": "LUI:将上立即数加载到 rd(上 20 位)。"
-                },
-                "AUIPC": {
-                    "opcode": "0010111",
-                    "structure": "rd, imm",
-                    "description_en": "AUIPC: Adds upper immediate to PC, stores in rd.",
-                    "description_zh": "AUIPC:将上立即数加到 PC,结果存入 rd。"
-                },
-            },
-            "UJ": {
-                "JAL": {
-                    "opcode": "1101111",
-                    "structure": "rd, imm",
-                    "description_en": "JAL: Jumps to PC + imm and stores return address in rd.",
-                    "description_zh": "JAL:跳转到 PC + imm,并将返回地址存入 rd。"
-                },
-            }
-        }
+        # Instructions dictionary (RV32I base instruction set), shared with the command-line tools
+        self.instructions = INSTRUCTIONS
         
         # Top settings frame
         self.settings_frame = ctk.CTkFrame(root, height=60)
@@ -611,14 +2841,7 @@ class RISCVConverterGUI:
         
         self.field_frames = {}
         self.entries = {}
-        self.field_names = {
-            "R": ["funct7", "rs2", "rs1", "funct3", "rd", "opcode"],
-            "I": ["imm", "rs1", "funct3", "rd", "opcode"],
-            "S": ["imm", "rs2", "rs1", "funct3", "opcode"],
-            "SB": ["imm", "rs2", "rs1", "funct3", "opcode"],
-            "U": ["imm", "rd", "opcode"],
-            "UJ": ["imm", "rd", "opcode"]
-        }
+        self.field_names = FIELD_NAMES
         self.field_hints = {
             "funct7": "funct7_hint",
             "funct3": "funct3_hint",
@@ -865,7 +3088,188 @@ class RISCVConverterGUI:
         self.instruction_var.set(self.translations[self.language_var.get()]["select_instruction"])
         self.update_instruction_info()  # Clear structure and description
 
+def run_batch(args):
+    """Encode a batch CSV file to hex/bin outputs."""
+    if args.no_cache:
+        words = encode_batch(read_batch_csv(args.input))
+    else:
+        words = cached_encode_file(args.input, EncodingCache(args.cache_dir, args.cache_max_bytes))
+    base = os.path.splitext(args.input)[0]
+    write_outputs(words, args.hex or base + ".hex", args.bin or base + ".bin")
+    print(f"Encoded {len(words)} instructions")
+    if args.verify:
+        index = verify_roundtrip(words)
+        if index is not None:
+            raise ValueError(f"Round-trip check failed at row {index}: 0x{words[index]:08x}")
+        print("Round-trip check passed")
+
+def run_simulate(args):
+    """Run a binary image on the RV32I simulator and report the final state."""
+    simulator = RV32ISimulator(read_image(args.image), args.memory_size, args.base)
+    start = time.perf_counter()
+    steps = simulator.run(args.max_steps, profile=args.profile > 0)
+    elapsed = time.perf_counter() - start
+    mips = steps / elapsed / 1e6 if elapsed else 0.0
+    print(f"Executed {steps} instructions in {elapsed:.3f}s ({mips:.2f} MIPS), stopped by {simulator.halt_reason or 'step limit'} at PC 0x{simulator.pc:08x}")
+    for i in range(1, 32):
+        if simulator.regs[i]:
+            print(f"x{i:<2} = 0x{simulator.regs[i]:08x} ({_signed(simulator.regs[i])})")
+    for pc, hits, text in simulator.hot_pcs(args.profile):
+        print(f"0x{pc:08x} {hits:>12}  {text}")
+
+def run_generate(args):
+    """Write a reproducible random instruction stream to hex/bin outputs."""
+    if not args.hex and not args.bin:
+        raise ValueError("Give at least one of --hex or --bin")
+    weights = parse_mix(args.mix)
+    start = time.perf_counter()
+    generate_instructions(args.count, args.seed, weights, args.hex, args.bin, args.workers)
+    print(f"Generated {args.count} instructions in {time.perf_counter() - start:.2f}s")
+
+def run_verify(args):
+    """Run the differential verification sweep and report the first divergence."""
+    start = time.perf_counter()
+    checked, divergence = run_verification(args.workers, args.samples, args.seed)
+    elapsed = time.perf_counter() - start
+    if divergence is None:
+        print(f"All encoding paths agree: {checked} cases checked in {elapsed:.1f}s")
+        return
+    print(f"Divergence in {divergence['path']}")
+    print(f"  expected: {divergence['expected']}")
+    print(f"  actual:   {divergence['actual']}")
+    if divergence["case"]:
+        inst_type, mnemonic, fields = divergence["case"]
+        print(f"  reproduce ({mnemonic}): process_instruction({inst_type!r}, {fields!r})")
+    sys.exit(1)
+
+def run_disasm(args):
+    """Disassemble the executable sections of a RISC-V ELF file."""
+    start = time.perf_counter()
+    if args.output:
+        with open(args.output, "w") as out:
+            total, mismatches = disassemble_elf(args.elf, out, args.verify)
+    else:
+        total, mismatches = disassemble_elf(args.elf, sys.stdout, args.verify)
+    summary = f"Disassembled {total} words in {time.perf_counter() - start:.2f}s"
+    if args.verify:
+        summary += f", {mismatches} re-encode mismatches"
+    print(summary, file=sys.stderr)
+    if mismatches:
+        sys.exit(1)
+
+def run_assemble(args):
+    """Assemble a source file to hex/bin outputs."""
+    with open(args.source) as f:
+        words, _ = assemble(f, args.base)
+    base = os.path.splitext(args.source)[0]
+    write_outputs(words, args.hex or base + ".hex", args.bin or base + ".bin")
+    print(f"Assembled {len(words)} instructions")
+
+def run_watch(args):
+    """Watch a directory and re-assemble sources as they change."""
+    watcher = SourceWatcher(args.directory, args.output_dir, poll_interval=args.poll_interval,
+                            scan_interval=args.scan_interval, debounce=args.debounce)
+    print(f"Watching {args.directory} (Ctrl+C to stop)")
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        pass
+
+def run_diff(args):
+    """Show the instructions that differ between two encoded programs."""
+    start = time.perf_counter()
+    differences, total, differing_blocks, blocks = diff_encoded(args.before, args.after, args.block_words, args.max_diffs, args.base)
+    disassemble = build_disassembler()
+    for address, before, after in differences:
+        before_text = f"0x{before:08x}  {disassemble(before)}" if before is not None else "(missing)"
+        after_text = f"0x{after:08x}  {disassemble(after)}" if after is not None else "(missing)"
+        print(f"0x{address:08x}:  {before_text:<40} -> {after_text}")
+    if total > len(differences):
+        print(f"... {total - len(differences)} more")
+    print(f"{total} differing words in {differing_blocks} of {blocks} blocks ({time.perf_counter() - start:.2f}s)")
+    if total:
+        sys.exit(1)
+
+def build_arg_parser():
+    """Build the command-line parser; running without a command starts the GUI."""
+    parser = argparse.ArgumentParser(description="RISC-V Instruction Converter")
+    subparsers = parser.add_subparsers(dest="command")
+
+    batch_parser = subparsers.add_parser("batch", help="encode a CSV of instruction rows (type, fields...)")
+    batch_parser.add_argument("input", help="CSV file, one instruction per row in GUI field order")
+    batch_parser.add_argument("--hex", help="hex output path (default: <input>.hex)")
+    batch_parser.add_argument("--bin", help="binary image output path (default: <input>.bin)")
+    batch_parser.add_argument("--no-cache", action="store_true", help="disable the on-disk encoding cache")
+    batch_parser.add_argument("--cache-dir", default=CACHE_DIR, help="encoding cache directory")
+    batch_parser.add_argument("--cache-max-bytes", type=int, default=CACHE_MAX_BYTES, help="encoding cache size limit")
+    batch_parser.add_argument("--verify", action="store_true", help="decode and re-encode the output as a round-trip check")
+    batch_parser.set_defaults(func=run_batch)
+
+    simulate_parser = subparsers.add_parser("simulate", help="run a binary image on the RV32I simulator")
+    simulate_parser.add_argument("image", help="little-endian binary image, e.g. the .bin written by batch")
+    simulate_parser.add_argument("--base", type=lambda value: int(value, 0), default=0, help="load address and initial PC")
+    simulate_parser.add_argument("--memory-size", type=lambda value: int(value, 0), default=1 << 20, help="simulator memory size in bytes")
+    simulate_parser.add_argument("--max-steps", type=int, default=10_000_000, help="stop after this many instructions")
+    simulate_parser.add_argument("--profile", type=int, default=0, metavar="N", help="count executions per PC and show the N hottest")
+    simulate_parser.set_defaults(func=run_simulate)
+
+    generate_parser = subparsers.add_parser("generate", help="generate a seeded random instruction stream")
+    generate_parser.add_argument("count", type=int, help="number of instructions")
+    generate_parser.add_argument("--seed", type=int, default=0, help="random seed; same seed gives the same output")
+    generate_parser.add_argument("--mix", help="mnemonic weights, e.g. ADD=5,LW=2,BEQ=1 (default: all equally)")
+    generate_parser.add_argument("--hex", help="hex output path")
+    generate_parser.add_argument("--bin", help="binary image output path")
+    generate_parser.add_argument("--workers", type=int, default=1, help="worker processes (output does not depend on this)")
+    generate_parser.set_defaults(func=run_generate)
+
+    verify_parser = subparsers.add_parser("verify", help="check every encoding path against the reference encoders")
+    verify_parser.add_argument("--workers", type=int, help="worker processes (default: all cores)")
+    verify_parser.add_argument("--samples", type=int, default=20000, help="random immediates per U/UJ instruction")
+    verify_parser.add_argument("--seed", type=int, default=0, help="random seed for sampled operands")
+    verify_parser.set_defaults(func=run_verify)
+
+    disasm_parser = subparsers.add_parser("disasm", help="disassemble the code sections of a RISC-V ELF file")
+    disasm_parser.add_argument("elf", help="ELF32 or ELF64 little-endian RISC-V file")
+    disasm_parser.add_argument("-o", "--output", help="output file (default: stdout)")
+    disasm_parser.add_argument("--verify", action="store_true", help="re-encode every decoded word and report mismatches")
+    disasm_parser.set_defaults(func=run_disasm)
+
+    assemble_parser = subparsers.add_parser("assemble", help="assemble a source file, expanding pseudo-instructions")
+    assemble_parser.add_argument("source", help="assembly source file (.s)")
+    assemble_parser.add_argument("--hex", help="hex output path (default: <source>.hex)")
+    assemble_parser.add_argument("--bin", help="binary image output path (default: <source>.bin)")
+    assemble_parser.add_argument("--base", type=lambda value: int(value, 0), default=0, help="address of the first instruction")
+    assemble_parser.set_defaults(func=run_assemble)
+
+    watch_parser = subparsers.add_parser("watch", help="re-assemble .s files under a directory whenever they change")
+    watch_parser.add_argument("directory", help="directory tree to watch")
+    watch_parser.add_argument("--output-dir", help="write .hex/.bin here, mirroring the tree (default: next to each source)")
+    watch_parser.add_argument("--poll-interval", type=float, default=WATCH_POLL_INTERVAL, help="seconds between polls of recently edited files")
+    watch_parser.add_argument("--scan-interval", type=float, default=WATCH_SCAN_INTERVAL, help="seconds between full rescans of the tree; also the worst-case delay before the first in-place save of a file not edited recently is noticed")
+    watch_parser.add_argument("--debounce", type=float, default=WATCH_DEBOUNCE, help="quiet time in seconds before building a burst of saves")
+    watch_parser.set_defaults(func=run_watch)
+
+    diff_parser = subparsers.add_parser("diff", help="compare two encoded programs (.bin, .hex or results.csv)")
+    diff_parser.add_argument("before", help="golden image or log")
+    diff_parser.add_argument("after", help="regenerated image or log")
+    diff_parser.add_argument("--block-words", type=int, default=DIFF_BLOCK_WORDS, help="words per hashed block")
+    diff_parser.add_argument("--max-diffs", type=int, default=100, help="show at most this many differing words")
+    diff_parser.add_argument("--base", type=lambda value: int(value, 0), default=0, help="address of the first word")
+    diff_parser.set_defaults(func=run_diff)
+    return parser
+
 if __name__ == "__main__":
-    root = ctk.CTk()
-    app = RISCVConverterGUI(root)
-    root.mainloop()
\ No newline at end of file
+    args = build_arg_parser().parse_args()
+    if args.command:
+        try:
+            args.func(args)
+        except (ValueError, OSError) as e:
+            sys.exit(f"Error: {e}")
+    else:
+        # Only the GUI needs the toolkit and pandas, so the command-line tools also run headless
+        import customtkinter as ctk
+        import tkinter.font as tkfont
+        import pandas as pd
+        root = ctk.CTk()
+        app = RISCVConverterGUI(root)
+        root.mainloop()
\ No newline at end of file
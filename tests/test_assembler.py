@@ -0,0 +1,85 @@
+import pytest
+
+import risc_v_instruction_converter_gui as conv
+
+FAR = ["nop"] * (1 << 18)  # 1 MiB of code, beyond the reach of jal
+
+
+def decode(words):
+    return [conv.disassemble_word(word) for word in words]
+
+
+def run(words, **kwargs):
+    simulator = conv.RV32ISimulator(words, memory_size=4 << 20, **kwargs)
+    simulator.run()
+    return simulator
+
+
+def test_near_branch_stays_short():
+    words, labels = conv.assemble(["beq a0, a1, done", "nop", "done:", "ecall"])
+    assert decode(words)[0] == "beq x10, x11, 8"
+    assert labels == {"done": 8}
+
+
+def test_branch_beyond_4_kib_is_inverted_over_a_jal():
+    words, labels = conv.assemble(["beq a0, a1, done"] + ["nop"] * 1100 + ["done:", "li a2, 7", "ecall"])
+    assert decode(words)[:2] == ["bne x10, x11, 8", f"jal x0, {labels['done'] - 4}"]
+    assert run(words).regs[12] == 7
+
+
+def test_relaxation_shifts_later_labels():
+    source = ["back:", "nop"] + ["bnez a0, back"] + ["nop"] * 1100 + ["bnez a0, back", "ecall"]
+    words, labels = conv.assemble(source)
+    # The first branch is near; the second is 4408 bytes after "back" and needs two words
+    assert len(words) == 1 + 1 + 1100 + 2 + 1
+    assert decode(words)[1] == "bne x10, x0, -4"
+    assert decode(words)[-3:-1] == ["beq x10, x0, 8", "jal x0, -4412"]
+
+
+def test_far_call_and_jal_go_through_the_link_register():
+    words, labels = conv.assemble(["call far", "ecall", "jal t0, far"] + FAR + ["far:", "li a0, 9", "ret"])
+    offset = labels["far"] - (256 << 12)
+    assert decode(words)[:5] == ["auipc x1, 256", f"jalr x1, {offset}(x1)", "ecall",
+                                 "auipc x5, 256", f"jalr x5, {offset - 12}(x5)"]
+    simulator = run(words)
+    assert simulator.regs[10] == 9
+    assert simulator.halt_reason == "ECALL" and simulator.pc == 8
+
+
+@pytest.mark.parametrize("statement, kind", [("beqz a0, far", "a branch"), ("j far", "a jump without a link register"),
+                                             ("jal x0, far", "a jump without a link register")])
+def test_far_branch_or_jump_without_link_is_an_error(statement, kind):
+    with pytest.raises(conv.AssemblySyntaxError, match=f"line 1, column .*: target 'far' is .* out of range for {kind}"):
+        conv.assemble([statement] + FAR + ["far:", "ecall"])
+
+
+def test_statements_separated_by_semicolons():
+    words, labels = conv.assemble(["start: li a0, 1; addi a0, a0, 2 ; mv a1, a0  # done; not code", "end: ecall"])
+    assert decode(words) == ["addi x10, x0, 1", "addi x10, x10, 2", "addi x11, x10, 0", "ecall"]
+    assert labels == {"start": 0, "end": 12}
+
+
+def test_operand_forms():
+    words, _ = conv.assemble(["lw ra, (sp)", "sw T0, -4( x2 )", "addi x1, zero, 0x10", "fence", "lui a0, 0xfffff"])
+    assert decode(words) == ["lw x1, 0(x2)", "sw x5, -4(x2)", "addi x1, x0, 16", "fence 15, 15", "lui x10, 1048575"]
+
+
+@pytest.mark.parametrize("source, location, message", [
+    ("addi x1, x2, 5000", "1, column 14", "addi immediate 5000 out of range -2048..2047"),
+    ("  li   a0,  0x1ffffffff", "1, column 13", "li immediate 8589934591 does not fit in 32 bits"),
+    ("slli x1, x2, 40", "1, column 14", "shift amount 40 out of range 0..31"),
+    ("beq x1, x2, 3", "1, column 13", "beq offset 3 must be even"),
+    ("beq x1, x2, nowhere", "1, column 13", "undefined label 'nowhere'"),
+    ("nop; addi x1,   x2, -3000", "1, column 21", "addi immediate -3000 out of range -2048..2047"),
+    ("lw x1, 4096(x2)", "1, column 8", "lw immediate 4096 out of range -2048..2047"),
+    ("nop\nadd x1, x2, x99", "2, column 13", "unknown register 'x99' for rs2"),
+    ("addi x1, x2", "1, column 12", "missing operand imm"),
+    ("add x1, x2, x3, x4", "1, column 17", "unexpected operand 'x4'"),
+    ("nop; frob x1", "1, column 6", "unknown instruction 'frob'"),
+    ("a: nop; a: nop", "1, column 9", "duplicate label 'a'"),
+    ("addi x1, x2, 1.5", "1, column 14", "invalid immediate '1.5'"),
+])
+def test_errors_point_at_the_offending_token(source, location, message):
+    with pytest.raises(conv.AssemblySyntaxError) as error:
+        conv.assemble(source.split("\n"))
+    assert str(error.value) == f"line {location}: {message}"
@@ -0,0 +1,76 @@
+import os
+import time
+
+import risc_v_instruction_converter_gui as conv
+
+
+def blob_sizes(directory):
+    return {name: os.path.getsize(os.path.join(directory, name))
+            for name in os.listdir(directory) if name.endswith(".bin")}
+
+
+def test_put_and_get_round_trip(tmp_path):
+    cache = conv.EncodingCache(str(tmp_path))
+    cache.put("k", [1, 2, 0xFFFFFFFF])
+    assert list(cache.get("k")) == [1, 2, 0xFFFFFFFF]
+    assert cache.get("missing") is None
+
+
+def test_eviction_drops_least_recently_used_entries(tmp_path):
+    cache = conv.EncodingCache(str(tmp_path), max_bytes=400)
+    now = time.time()
+    for age, key in zip((400, 300, 200, 100), "abcd"):
+        cache.put(key, range(25))
+        os.utime(cache.path(key), (now - age, now - age))
+    # Reading "a" makes it the most recently used entry
+    cache.get("a")
+    cache.put("e", range(25))
+    remaining = blob_sizes(str(tmp_path))
+    assert sorted(name[0] for name in remaining) == ["a", "d", "e"]
+    assert sum(remaining.values()) <= 400 * conv.CACHE_EVICT_TARGET
+    # The running total matches the directory
+    assert cache._read_usage()[0] == sum(remaining.values())
+
+
+def test_running_total_tracks_replaced_entries(tmp_path):
+    cache = conv.EncodingCache(str(tmp_path))
+    cache.put("a", range(10))
+    cache.put("b", range(20))
+    cache.put("a", range(5))
+    assert cache._read_usage()[0] == sum(blob_sizes(str(tmp_path)).values()) == 100
+
+
+def test_stale_temporary_files_are_removed(tmp_path):
+    cache = conv.EncodingCache(str(tmp_path))
+    stale = tmp_path / "left-over.tmp"
+    stale.write_bytes(b"\0" * 64)
+    old = time.time() - 2 * conv.CACHE_TMP_GRACE
+    os.utime(stale, (old, old))
+    fresh = tmp_path / "in-progress.tmp"
+    fresh.write_bytes(b"\0" * 32)
+    with conv.file_lock(cache.lock_path):
+        cache.evict()
+    assert not stale.exists()
+    assert fresh.exists()
+    assert cache._read_usage()[0] == 32
+
+
+def test_cached_encode_file_reencodes_only_changed_chunks(tmp_path, monkeypatch):
+    rows = [f"I,{i % 2048},{i % 32},000,{(i + 1) % 32},0010011\n" for i in range(2000)]
+    source = tmp_path / "rows.csv"
+    source.write_text("".join(rows))
+    cache = conv.EncodingCache(str(tmp_path / "cache"))
+    cold = conv.cached_encode_file(str(source), cache, chunk_size=64)
+    assert list(cold) == list(conv.encode_batch(conv.read_batch_csv(str(source))))
+
+    encoded_rows = []
+    encode_batch = conv.encode_batch
+    monkeypatch.setattr(conv, "encode_batch", lambda rows: encoded_rows.extend(rows) or encode_batch(rows))
+    assert list(conv.cached_encode_file(str(source), cache, chunk_size=64)) == list(cold)
+    assert encoded_rows == []
+
+    # An inserted line only changes the chunk around it
+    source.write_text("".join(rows[:1000] + ["I,7,1,000,2,0010011\n"] + rows[1000:]))
+    warm = conv.cached_encode_file(str(source), cache, chunk_size=64)
+    assert list(warm) == list(encode_batch(conv.read_batch_csv(str(source))))
+    assert 0 < len(encoded_rows) < len(rows) // 4
@@ -0,0 +1,66 @@
+import csv
+
+import pytest
+
+import risc_v_instruction_converter_gui as conv
+
+
+@pytest.fixture
+def words():
+    return conv.generate_chunk(5, 0, 3000, conv.parse_mix(None)).tolist()
+
+
+def write_results_csv(path, words):
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=["Instruction Type", "Specific Instruction", "Binary", "Hex"])
+        writer.writeheader()
+        for word in words:
+            inst_type, mnemonic, fields = conv.decode_word(word)
+            binary, hex_text = conv.process_instruction(inst_type, fields)
+            writer.writerow({"Instruction Type": inst_type, "Specific Instruction": mnemonic,
+                             "Binary": binary, "Hex": hex_text})
+    return str(path)
+
+
+def test_mixed_formats_compare_equal(tmp_path, words):
+    conv.write_outputs(words, str(tmp_path / "a.hex"), str(tmp_path / "a.bin"))
+    (tmp_path / "upper.txt").write_text("".join(f"0X{word:08X}\n" for word in words))
+    (tmp_path / "binary.txt").write_text("".join(f"{word:032b}\n" for word in words))
+    others = ["a.hex", "upper.txt", "binary.txt", write_results_csv(tmp_path / "results.csv", words)]
+    for other in others:
+        differences, total, differing, blocks = conv.diff_encoded(str(tmp_path / "a.bin"), str(tmp_path / other),
+                                                                  block_words=512)
+        assert (differences, total, differing, blocks) == ([], 0, 0, 6), other
+
+
+def test_hex_listing_is_mapped_only_when_every_record_is_complete(tmp_path, words):
+    conv.write_outputs(words, str(tmp_path / "a.hex"), str(tmp_path / "a.bin"))
+    assert {kind for kind, _, _ in conv.iter_word_blocks(str(tmp_path / "a.hex"), 512)} == {"hex"}
+    # One short and one long line keep the size a multiple of 11 and the first line intact
+    lines = [f"0x{word:08x}\n" for word in words]
+    lines[1500] = f"0x{words[1500]:07x}\n"
+    lines[1501] = f"0x{words[1501]:09x}\n"
+    (tmp_path / "b.hex").write_text("".join(lines))
+    assert {kind for kind, _, _ in conv.iter_word_blocks(str(tmp_path / "b.hex"), 512)} == {"words"}
+    assert conv.diff_encoded(str(tmp_path / "a.bin"), str(tmp_path / "b.hex"))[1] == 0
+
+
+def test_differences_are_reported_by_address(tmp_path, words):
+    conv.write_outputs(words, bin_path=str(tmp_path / "a.bin"))
+    changed = list(words)
+    changed[700] ^= 1 << 7
+    changed.append(0x13)
+    conv.write_outputs(changed, hex_path=str(tmp_path / "b.hex"))
+    differences, total, differing, blocks = conv.diff_encoded(str(tmp_path / "a.bin"), str(tmp_path / "b.hex"),
+                                                              block_words=512, base=0x1000)
+    assert differences == [(0x1000 + 4 * 700, words[700], changed[700]), (0x1000 + 4 * 3000, None, 0x13)]
+    assert (total, differing, blocks) == (2, 2, 6)
+
+
+def test_unreadable_inputs_are_errors(tmp_path):
+    (tmp_path / "odd.bin").write_bytes(b"\0" * 6)
+    with pytest.raises(ValueError, match="not a multiple of 4 bytes"):
+        list(conv.iter_word_blocks(str(tmp_path / "odd.bin")))
+    (tmp_path / "bad.hex").write_text("0x00000013\nnot a word\n")
+    with pytest.raises(ValueError, match="line 2: not an encoded instruction"):
+        list(conv.iter_word_blocks(str(tmp_path / "bad.hex")))
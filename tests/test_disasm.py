@@ -0,0 +1,105 @@
+import io
+import itertools
+import struct
+
+import pytest
+
+import risc_v_instruction_converter_gui as conv
+
+BASE = 0x10000
+
+
+def write_elf(path, text, symbols, flags=0):
+    """Write a minimal ELF32 RISC-V file with one .text section and a symbol table."""
+    strtab = b"\0"
+    entries = [struct.pack("<IIIBBH", 0, 0, 0, 0, 0, 0)]
+    for name, address in symbols:
+        entries.append(struct.pack("<IIIBBH", len(strtab), address, 0, 0x12, 0, 1))
+        strtab += name.encode() + b"\0"
+    symtab = b"".join(entries)
+    shstrtab = b"\0.text\0.symtab\0.strtab\0.shstrtab\0"
+    body = b""
+    offsets = []
+    for blob in (text, symtab, strtab, shstrtab):
+        offsets.append(52 + len(body))
+        body += blob + b"\0" * (-len(blob) % 4)
+
+    def header(name, sh_type, flags, addr, offset, size, link=0, info=0, entsize=0):
+        return struct.pack("<IIIIIIIIII", name, sh_type, flags, addr, offset, size, link, info, 4, entsize)
+
+    sections = (header(0, 0, 0, 0, 0, 0)
+                + header(1, 1, 6, BASE, offsets[0], len(text))
+                + header(7, 2, 0, 0, offsets[1], len(symtab), 3, 1, 16)
+                + header(15, 3, 0, 0, offsets[2], len(strtab))
+                + header(23, 3, 0, 0, offsets[3], len(shstrtab)))
+    elf_header = (b"\x7fELF" + bytes([1, 1, 1, 0]) + b"\0" * 8
+                  + struct.pack("<HHIIIIIHHHHHH", 2, 243, 1, BASE, 0, 52 + len(body), flags, 52, 0, 0, 40, 5, 4))
+    path.write_bytes(elf_header + body + sections)
+    return str(path)
+
+
+def program():
+    source = [line for i in range(5) for line in ("li a0, 5", f"loop{i}:", "addi a0, a0, -1", f"bnez a0, loop{i}", "ecall")]
+    words, _ = conv.assemble(source)
+    return list(words) + [0xFFFFFFFF]
+
+
+def disassemble(path, reencode=False):
+    out = io.StringIO()
+    result = conv.disassemble_elf(path, out, reencode)
+    return out.getvalue(), result
+
+
+def expected_listing(words, labels):
+    lines = ["", "Disassembly of section .text:"]
+    for index, word in enumerate(words):
+        address = BASE + 4 * index
+        for name, label_address in labels:
+            if address <= label_address < address + 4:
+                lines += ["", f"{label_address:08x} <{name}>:"]
+        lines.append(f"{address:8x}:\t{word:08x}\t{conv.disassemble_word(word)}")
+    return lines
+
+
+@pytest.mark.parametrize("block_words", [conv.DISASSEMBLY_BLOCK_WORDS, 3])
+def test_listing_matches_disassemble_word(tmp_path, monkeypatch, block_words):
+    word_blocks = conv.ElfFile.word_blocks
+    monkeypatch.setattr(conv.ElfFile, "word_blocks", lambda self, section: word_blocks(self, section, block_words))
+    words = program()
+    symbols = [("main", BASE), ("$x", BASE), (".L1", BASE + 8), ("middle", BASE + 40), ("odd", BASE + 42)]
+    path = write_elf(tmp_path / "a.elf", struct.pack(f"<{len(words)}I", *words), symbols)
+    text, (total, mismatches) = disassemble(path)
+    labels = [("main", BASE), ("middle", BASE + 40), ("odd", BASE + 42)]
+    assert text.splitlines() == expected_listing(words, labels)
+    assert (total, mismatches) == (len(words), 0)
+
+
+def test_verify_path_gives_the_same_listing(tmp_path):
+    words = program()
+    path = write_elf(tmp_path / "a.elf", struct.pack(f"<{len(words)}I", *words), [("main", BASE), ("odd", BASE + 6)])
+    assert disassemble(path, reencode=True) == disassemble(path)
+
+
+def test_trailing_bytes_are_shown(tmp_path):
+    words = program()[:3]
+    path = write_elf(tmp_path / "a.elf", struct.pack("<3I", *words) + b"\x34\x12\xab", [("tail", BASE + 14)])
+    text, (total, _) = disassemble(path)
+    assert total == 3
+    assert text.splitlines()[-4:] == ["   1000c:\t1234\t.half 0x1234", "", "0001000e <tail>:", "   1000e:\tab\t.byte 0xab"]
+
+
+def test_compressed_files_are_refused(tmp_path):
+    path = write_elf(tmp_path / "a.elf", b"\x01\x00" * 4, [], flags=conv.EF_RISCV_RVC)
+    with pytest.raises(ValueError, match="EF_RISCV_RVC"):
+        disassemble(path)
+
+
+def test_format_disassembly_matches_disassemble_word():
+    words = conv.generate_chunk(3, 0, 5000, conv.parse_mix(None))
+    words[::7] = conv.np.random.default_rng(0).integers(0, 1 << 32, len(words[::7]), dtype=conv.np.uint32)
+    addresses = 0xFFFFF000 + 4 * conv.np.arange(len(words), dtype=conv.np.uint64)
+    text, offsets = conv.format_disassembly(addresses, words)
+    lines = text.decode("ascii").splitlines(keepends=True)
+    assert lines == [f"{int(address):8x}:\t{int(word):08x}\t{conv.disassemble_word(int(word))}\n"
+                     for address, word in zip(addresses, words)]
+    assert offsets.tolist() == list(itertools.accumulate(map(len, lines[:-1]), initial=0))
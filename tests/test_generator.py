@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+
+import risc_v_instruction_converter_gui as conv
+
+
+def test_parse_mix_weights():
+    weights = conv.parse_mix("add=5, LW=2,BEQ")
+    mnemonics = conv.GENERATOR_TABLES["mnemonics"]
+    assert weights[mnemonics.index("ADD")] == 5.0
+    assert weights[mnemonics.index("LW")] == 2.0
+    assert weights[mnemonics.index("BEQ")] == 1.0
+    assert sum(weights) == 8.0
+
+
+@pytest.mark.parametrize("weight", ["-1", "nan", "inf", "1e400", "x"])
+def test_parse_mix_rejects_bad_weights(weight):
+    with pytest.raises(ValueError, match=f"Weight for ADD .*{weight}"):
+        conv.parse_mix(f"LW=1,ADD={weight}")
+
+
+def test_parse_mix_rejects_unknown_mnemonic_and_zero_total():
+    with pytest.raises(ValueError, match="Unknown mnemonic in mix: FOO"):
+        conv.parse_mix("FOO=1")
+    with pytest.raises(ValueError, match="positive total weight"):
+        conv.parse_mix("ADD=0")
+
+
+def test_generated_chunks_are_reproducible_and_decode():
+    weights = conv.parse_mix(None)
+    words = conv.generate_chunk(7, 3, 5000, weights)
+    assert np.array_equal(words, conv.generate_chunk(7, 3, 5000, weights))
+    assert conv.verify_roundtrip(words.tolist()) is None
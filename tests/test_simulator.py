@@ -0,0 +1,63 @@
+import pytest
+
+import risc_v_instruction_converter_gui as conv
+
+
+def run(source, **kwargs):
+    words, _ = conv.assemble(source)
+    simulator = conv.RV32ISimulator(words, **kwargs)
+    return simulator, simulator.run()
+
+
+def test_loop_runs_to_ecall():
+    simulator, steps = run(["li t0, 1000", "loop:", "addi t1, t1, 3", "addi t0, t0, -1", "bnez t0, loop", "ecall"])
+    assert simulator.regs[6] == 3000
+    assert simulator.halt_reason == "ECALL"
+    assert simulator.pc == 16
+    assert steps == simulator.instruction_count == 1 + 3 * 1000 + 1
+
+
+def test_step_limit_resumes_where_it_stopped():
+    words, _ = conv.assemble(["li a0, 1", "li a1, 2", "ecall"])
+    simulator = conv.RV32ISimulator(words)
+    assert simulator.run(max_steps=1) == 1
+    assert simulator.halt_reason is None and simulator.pc == 4
+    assert simulator.run() == 2
+    assert simulator.halt_reason == "ECALL" and simulator.regs[11] == 2
+
+
+def test_store_redecodes_overwritten_instruction():
+    ecall = int(conv.process_instruction("I", conv._case("I", "ECALL")[2])[0], 2)
+    words, _ = conv.assemble(["la t0, target", "li t2, 128", "li t3, 2", "again:", "target:",
+                              "addi a0, a0, 5", "lw t1, 0(t2)", "sw t1, 0(t0)",
+                              "addi t3, t3, -1", "bnez t3, again", "ecall"])
+    words = list(words) + [0] * (32 - len(words)) + [ecall]
+    simulator = conv.RV32ISimulator(words, memory_size=256)
+    simulator.run()
+    # The second pass executes the ECALL stored over the addi
+    assert simulator.regs[10] == 5
+    assert simulator.pc == 0x10
+
+
+def test_profile_counts_each_pc():
+    words, _ = conv.assemble(["li t0, 10", "loop:", "addi t0, t0, -1", "bnez t0, loop", "ecall"])
+    simulator = conv.RV32ISimulator(words)
+    simulator.run(profile=True)
+    assert [(pc, hits) for pc, hits, _ in simulator.hot_pcs(3)] == [(4, 10), (8, 10), (0, 1)]
+
+
+def test_errors_name_the_pc():
+    simulator = conv.RV32ISimulator([0x13, 0])
+    with pytest.raises(ValueError, match="PC 0x00000004: Unknown instruction 0x00000000"):
+        simulator.run()
+    assert simulator.instruction_count == 1
+    words, _ = conv.assemble(["nop"] * 4)
+    with pytest.raises(ValueError, match="PC 0x00000010 is outside simulator memory"):
+        conv.RV32ISimulator(words, memory_size=16).run()
+    words, _ = conv.assemble(["li t0, 6", "jr t0"])
+    with pytest.raises(ValueError, match="misaligned address 0x00000006"):
+        conv.RV32ISimulator(words).run()
+
+
+def test_alu_matches_reference():
+    assert conv.check_simulator(samples=20, seed=1) is None
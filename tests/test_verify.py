@@ -0,0 +1,54 @@
+import itertools
+
+import risc_v_instruction_converter_gui as conv
+
+
+def sample_cases(step=401):
+    return list(itertools.islice(conv.verification_cases(samples=50, seed=2), 0, None, step))
+
+
+def test_all_paths_agree(tmp_path):
+    assert conv.check_cases(sample_cases(), str(tmp_path / "cache")) is None
+
+
+def test_batch_failure_reports_the_failing_row(tmp_path, monkeypatch):
+    cases = sample_cases()
+    bad = cases[17]
+    encode_batch = conv.encode_batch
+
+    def failing_encode_batch(rows):
+        if any(fields == bad[2] for _, fields in rows):
+            raise ValueError("broken row")
+        return encode_batch(rows)
+
+    monkeypatch.setattr(conv, "encode_batch", failing_encode_batch)
+    divergence = conv.check_cases(cases, str(tmp_path / "cache"))
+    assert divergence["path"] == "encode_batch"
+    assert divergence["case"] == bad
+    assert divergence["actual"] == "broken row"
+
+
+def test_assembler_encoder_failure_reports_the_failing_row(tmp_path, monkeypatch):
+    cases = sample_cases()
+    raw_immediate = conv._raw_immediate
+
+    def failing_raw_immediate(mnemonic, value, line, column):
+        if line == 31:
+            raise ValueError("bad immediate")
+        return raw_immediate(mnemonic, value, line, column)
+
+    monkeypatch.setattr(conv, "_raw_immediate", failing_raw_immediate)
+    divergence = conv.check_cases(cases, str(tmp_path / "cache"))
+    assert divergence["path"] == "encode_instructions"
+    assert divergence["case"] == cases[30]
+
+
+def test_divergence_is_shrunk(tmp_path, monkeypatch):
+    format_hex_lines = conv.format_hex_lines
+    # Break hex formatting for words with x31 as rd
+    monkeypatch.setattr(conv, "format_hex_lines", lambda words: format_hex_lines(
+        words ^ (((words >> 7) & 0x1F) == 31).astype(words.dtype)))
+    case = conv._case("R", "ADD", rd=31, rs1=9, rs2=22)
+    divergence = conv.shrink_divergence(conv.check_cases([case], str(tmp_path / "cache")), str(tmp_path / "cache"))
+    assert divergence["path"] == "format_hex_lines"
+    assert divergence["case"] == conv._case("R", "ADD", rd=31)